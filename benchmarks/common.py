@@ -0,0 +1,68 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Fixtures use the same layout the bot writes uploads to:
+
+    <fixtures>/id_card/*.jpg
+    <fixtures>/license/*.jpg
+    <fixtures>/log_card/*.jpg
+
+An optional JSON file next to an image (``photo.jpg`` -> ``photo.json``)
+holds the expected ``{"Field": "value"}`` pairs for accuracy scoring.
+"""
+import json
+import os
+import resource
+from typing import Dict, List, Optional
+
+DOCUMENT_TYPES = ('id_card', 'license', 'log_card')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def load_fixtures(root: str) -> List[dict]:
+    """Return [{'path', 'document_type', 'expected'}] for every fixture image under root."""
+    fixtures = []
+    for document_type in DOCUMENT_TYPES:
+        directory = os.path.join(root, document_type)
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            if not name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            path = os.path.join(directory, name)
+            expected_path = os.path.splitext(path)[0] + '.json'
+            expected = None
+            if os.path.exists(expected_path):
+                with open(expected_path) as f:
+                    expected = json.load(f)
+            fixtures.append({'path': path, 'document_type': document_type, 'expected': expected})
+    return fixtures
+
+
+def parse_fields(text) -> Dict[str, str]:
+    """Parse 'Field: value' lines the same way the controller does."""
+    if isinstance(text, tuple):
+        text = text[0]
+    fields = {}
+    for line in (text or '').split('\n'):
+        if ':' in line:
+            key, value = line.split(':', 1)
+            fields[key.strip()] = value.strip()
+    return fields
+
+
+def _normalize(value: str) -> str:
+    return ' '.join(str(value).lower().split())
+
+
+def field_accuracy(predicted: Dict[str, str], expected: Dict[str, str]) -> Optional[float]:
+    """Fraction of expected fields whose predicted value matches (case/whitespace insensitive)."""
+    if not expected:
+        return None
+    hits = sum(1 for k, v in expected.items() if _normalize(predicted.get(k, '')) == _normalize(v))
+    return hits / len(expected)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
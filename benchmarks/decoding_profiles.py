@@ -0,0 +1,81 @@
+"""
+Compare decoding profiles on the fixture images.
+
+For every profile in model.decoding.DECODING_PROFILES this reports generated
+tokens per second and field accuracy. Accuracy is measured against the
+fixture's expected JSON when present, otherwise against the output of
+--reference (accurate-beam by default).
+
+    python -m benchmarks.decoding_profiles --fixtures image_documents
+"""
+import argparse
+import sys
+import time
+
+import torch
+from dotenv import load_dotenv
+
+from benchmarks.common import field_accuracy, load_fixtures, parse_fields
+from model.decoding import DECODING_PROFILES
+from model.document_processor import DocumentProcessorFactory
+
+
+def generate(document_processor, image, generation_kwargs):
+    """Single-image generate, returning (formatted text, new token count, seconds)."""
+    inputs = document_processor.processor(
+        text=[document_processor.prompt],
+        images=[[image]],
+        return_tensors="pt",
+        padding=True
+    ).to(document_processor.device)
+
+    start = time.perf_counter()
+    with torch.no_grad():
+        output_ids = document_processor.model.generate(**inputs, **generation_kwargs)
+    seconds = time.perf_counter() - start
+
+    new_tokens = output_ids.shape[1] - inputs['input_ids'].shape[1]
+    text = document_processor.processor.batch_decode(output_ids[:, inputs['input_ids'].shape[1]:], skip_special_tokens=True)[0]
+    return document_processor.format_text(text), new_tokens, seconds
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', default='image_documents')
+    parser.add_argument('--profiles', nargs='+', default=list(DECODING_PROFILES))
+    parser.add_argument('--reference', default='accurate-beam')
+    args = parser.parse_args()
+
+    load_dotenv()
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        print(f"No fixtures found under {args.fixtures}")
+        return 1
+
+    profiles = list(dict.fromkeys([args.reference] + args.profiles))
+    outputs = {name: [] for name in profiles}
+    for fixture in fixtures:
+        document_processor = DocumentProcessorFactory.get_processor(fixture['document_type'])
+        image = document_processor.resize_for_model(document_processor.verify_image(fixture['path']))
+        for name in profiles:
+            outputs[name].append(generate(document_processor, image, DECODING_PROFILES[name]))
+
+    reference_fields = [parse_fields(text) for text, _, _ in outputs[args.reference]]
+
+    print(f"{'profile':<14} {'tokens/s':>9} {'mean s':>7} {'accuracy':>9}")
+    for name in profiles:
+        tokens = sum(n for _, n, _ in outputs[name])
+        seconds = sum(s for _, _, s in outputs[name])
+        scores = [
+            field_accuracy(parse_fields(text), fixture['expected'] or reference)
+            for (text, _, _), fixture, reference in zip(outputs[name], fixtures, reference_fields)
+        ]
+        scores = [s for s in scores if s is not None]
+        accuracy = sum(scores) / len(scores) if scores else 0.0
+        print(f"{name:<14} {tokens / seconds:>9.1f} {seconds / len(fixtures):>7.2f} {accuracy:>9.3f}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Decode + resize time and peak memory for large phone photos.
+
+Compares the previous path (full decode, RGB convert, LANCZOS to 1024px,
+then the processor's own resize to its input size) against draft-mode
+decoding followed by a single resize to the model's input size. Each
+variant runs in its own process so peak RSS is not shared.
+
+    python -m benchmarks.image_decode --width 4000 --height 3000 --runs 10
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from PIL import Image, ImageDraw
+
+from benchmarks.common import peak_rss_mb
+from model.image_loading import decode_image, fit_to_model, model_input_size
+
+VARIANTS = ('full-decode', 'draft-decode')
+
+
+def synthetic_photo(width: int, height: int) -> bytes:
+    """A noisy, text-covered JPEG roughly the size of a phone camera shot."""
+    noise = Image.effect_noise((width, height), 40).convert('RGB')
+    draw = ImageDraw.Draw(noise)
+    for y in range(0, height, 60):
+        draw.text((40, y), "Name: SAMPLE  ID Number: S1234567A  Date of birth: 01 Jan 1990", fill='black')
+    buffer = io.BytesIO()
+    noise.save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def full_decode(data: bytes) -> Image.Image:
+    image = Image.open(io.BytesIO(data)).convert('RGB')
+    image.thumbnail((1024, 1024), Image.Resampling.LANCZOS)
+    # The image processor then resized again to its own input size
+    return image.resize(model_input_size(image.size), Image.Resampling.LANCZOS)
+
+
+def draft_decode(data: bytes) -> Image.Image:
+    return fit_to_model(decode_image(data))
+
+
+def run_variant(variant: str, photo_path: str, runs: int) -> dict:
+    with open(photo_path, 'rb') as f:
+        data = f.read()
+    baseline_mb = peak_rss_mb()
+    function = full_decode if variant == 'full-decode' else draft_decode
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        image = function(data)
+        timings.append(time.perf_counter() - start)
+
+    return {
+        'variant': variant,
+        'output_size': image.size,
+        'mean_ms': sum(timings) / len(timings) * 1000,
+        'min_ms': min(timings) * 1000,
+        'peak_extra_mb': peak_rss_mb() - baseline_mb,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--width', type=int, default=4000)
+    parser.add_argument('--height', type=int, default=3000)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--variant', choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument('--photo', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.photo, args.runs)))
+        return 0
+
+    # Generated here so its memory does not count towards the variants' peaks
+    with tempfile.NamedTemporaryFile(suffix='.jpg', delete=False) as photo:
+        photo.write(synthetic_photo(args.width, args.height))
+    try:
+        report(photo.name, args)
+    finally:
+        os.remove(photo.name)
+    return 0
+
+
+def report(photo_path: str, args) -> None:
+    print(f"{args.width}x{args.height} JPEG ({os.path.getsize(photo_path) / 1024:.0f} KB), {args.runs} runs")
+    print(f"{'variant':<13} {'output':>11} {'mean ms':>8} {'min ms':>7} {'peak +MB':>9}")
+    for variant in VARIANTS:
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.image_decode', '--variant', variant,
+             '--photo', photo_path, '--runs', str(args.runs)],
+            capture_output=True, text=True, check=True
+        )
+        result = json.loads(completed.stdout)
+        output = 'x'.join(str(d) for d in result['output_size'])
+        print(
+            f"{variant:<13} {output:>11} {result['mean_ms']:>8.1f} "
+            f"{result['min_ms']:>7.1f} {result['peak_extra_mb']:>9.1f}"
+        )
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Startup import-time budget for the bot.
+
+Runs ``python -X importtime -c "import bot"`` in a fresh interpreter, prints
+the slowest top-level imports and fails when the total exceeds --budget-ms
+or when a heavy model dependency is imported at startup (those must only be
+loaded on first use or by the background warm-up).
+
+    python -m benchmarks.import_time --budget-ms 1000
+"""
+import argparse
+import subprocess
+import sys
+
+HEAVY_MODULES = ('torch', 'transformers', 'cv2', 'pytesseract', 'numpy')
+
+
+def measure(module: str):
+    """Return [(cumulative_us, package)] for every import made while importing module."""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, check=True
+    )
+    imports = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, package = line[len('import time:'):].split('|')
+        # Drop the separator space; nested imports keep their indentation
+        imports.append((int(cumulative_us), package[1:].rstrip()))
+    return imports
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default='bot')
+    parser.add_argument('--budget-ms', type=float, default=1000)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    imports = measure(args.module)
+    # Top-level imports are the ones without leading indentation
+    top_level = [(us, package.strip()) for us, package in imports if not package.startswith('  ')]
+    total_ms = sum(us for us, _ in top_level) / 1000
+
+    print(f"{'cumulative ms':>14}  module")
+    for us, package in sorted(top_level, reverse=True)[:args.top]:
+        print(f"{us / 1000:>14.1f}  {package}")
+    print(f"\nTotal import time for '{args.module}': {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+
+    heavy = sorted({package.strip() for _, package in imports if package.strip().split('.')[0] in HEAVY_MODULES})
+    failed = False
+    if heavy:
+        print(f"Heavy modules imported at startup: {', '.join(heavy)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print("Import time budget exceeded")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Latency and field recall of log cards read as one image vs. as tiles.
+
+Every log card fixture is decoded at the size its mode uses, cropped and
+read once with LOG_CARD_RESOLUTION=single and once with =tiled (grid from
+LOG_CARD_TILE_GRID). Recall is the share of fields with a value; accuracy
+is scored against the fixture's expected JSON when present. The log card
+processor's built-in default values are bypassed so they do not count as
+recalled.
+
+    python -m benchmarks.log_card_tiling --fixtures image_documents
+"""
+import argparse
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+from benchmarks.common import field_accuracy, load_fixtures, parse_fields
+from model.document_processor import DocumentProcessorFactory
+from model.image_loading import decode_longest_edge, decode_image
+
+MODES = ('single', 'tiled')
+
+
+def read_log_card(path: str) -> tuple:
+    """(fields, seconds) for one fixture under the current LOG_CARD_RESOLUTION."""
+    with open(path, 'rb') as f:
+        image = decode_image(f.read(), decode_longest_edge('log_card'))
+
+    document_processor = DocumentProcessorFactory.get_processor('log_card')
+    start = time.perf_counter()
+    prepared, longest_edge = document_processor.prepare_image(image)
+    text = document_processor.extract_text(prepared, longest_edge)
+    return parse_fields(text), time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', default='image_documents')
+    args = parser.parse_args()
+
+    load_dotenv()
+    fixtures = [f for f in load_fixtures(args.fixtures) if f['document_type'] == 'log_card']
+    if not fixtures:
+        print(f"No log card fixtures found under {args.fixtures}")
+        return 1
+
+    print(f"{'mode':<7} {'mean s':>7} {'recall':>7} {'accuracy':>9}")
+    for mode in MODES:
+        os.environ['LOG_CARD_RESOLUTION'] = mode
+        field_count = len(DocumentProcessorFactory.get_processor('log_card').FIELDS)
+
+        seconds, recalls, scores = [], [], []
+        for fixture in fixtures:
+            fields, elapsed = read_log_card(fixture['path'])
+            seconds.append(elapsed)
+            recalls.append(sum(1 for value in fields.values() if value) / field_count)
+            score = field_accuracy(fields, fixture['expected'])
+            if score is not None:
+                scores.append(score)
+
+        accuracy = f"{sum(scores) / len(scores):>9.3f}" if scores else f"{'-':>9}"
+        print(f"{mode:<7} {sum(seconds) / len(seconds):>7.2f} {sum(recalls) / len(recalls):>7.3f} {accuracy}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Calibrate the QUALITY_* thresholds of the upload quality gate.
+
+Fixtures are taken to be usable photos, so every rejection is a false one.
+For each document type this prints the spread of each metric and how many
+fixtures the current thresholds (from the environment or .env) would
+reject, and why. Enable QUALITY_GATE once the rejection count is zero on a
+representative set, including white paper log cards and cards on light
+desks.
+
+    python -m benchmarks.quality_calibration --fixtures image_documents
+"""
+import argparse
+import sys
+from collections import Counter
+
+from dotenv import load_dotenv
+
+
+def _percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', default='image_documents')
+    parser.add_argument('--verbose', action='store_true', help="Print the metrics of every fixture")
+    args = parser.parse_args()
+
+    # Thresholds are read at import, so load .env first
+    load_dotenv()
+    from benchmarks.common import DOCUMENT_TYPES, load_fixtures
+    from model.image_loading import decode_image, decode_longest_edge
+    from model.quality import assess_quality, quality_metrics
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        print(f"No fixtures found under {args.fixtures}")
+        return 1
+
+    rejected_total = 0
+    for document_type in DOCUMENT_TYPES:
+        subset = [f for f in fixtures if f['document_type'] == document_type]
+        if not subset:
+            continue
+
+        metrics, reasons = [], Counter()
+        for fixture in subset:
+            with open(fixture['path'], 'rb') as f:
+                image = decode_image(f.read(), decode_longest_edge(document_type))
+            values = quality_metrics(image)
+            metrics.append(values)
+            is_usable, message = assess_quality(image)
+            if not is_usable:
+                reasons[message] += 1
+            if args.verbose:
+                print(
+                    f"{fixture['path']}: brightness {values['brightness']:.0f}, sharpness {values['sharpness']:.0f}, "
+                    f"glare {values['glare']:.1%}, document {values['document_area']:.0%}"
+                    f"{'' if is_usable else ' -> rejected'}"
+                )
+
+        print(f"\n{document_type} ({len(subset)} fixtures)")
+        print(f"{'metric':<14} {'min':>8} {'p5':>8} {'median':>8} {'p95':>8} {'max':>8}")
+        for name in ('brightness', 'sharpness', 'glare', 'document_area'):
+            values = [m[name] for m in metrics]
+            row = [min(values), _percentile(values, 0.05), _percentile(values, 0.5), _percentile(values, 0.95), max(values)]
+            print(f"{name:<14} " + ' '.join(f"{value:>8.3f}" for value in row))
+
+        rejected = sum(reasons.values())
+        rejected_total += rejected
+        print(f"rejected: {rejected}/{len(subset)}")
+        for message, count in reasons.most_common():
+            print(f"  {count} x {message}")
+
+    return 1 if rejected_total else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Accuracy-regression and latency check for MODEL_QUANTIZATION modes.
+
+Each mode runs in its own process (the model singleton is loaded once per
+process) over the fixture set. Fields are scored against the fixture's
+expected JSON when present, otherwise against the full-precision output.
+
+    python -m benchmarks.quantization_check --fixtures image_documents --modes none int8 bf16
+
+Exits non-zero when a mode's mean accuracy drops more than --max-drop below
+the full-precision baseline.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import field_accuracy, load_fixtures, parse_fields, peak_rss_mb
+
+
+def run_worker(fixtures_dir: str, output: str) -> None:
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from model import process_document
+    from model.model_singleton import ModelSingleton
+
+    start = time.perf_counter()
+    ModelSingleton.get_instance()
+    load_seconds = time.perf_counter() - start
+
+    results = []
+    for fixture in load_fixtures(fixtures_dir):
+        start = time.perf_counter()
+        text = process_document(fixture['path'], fixture['document_type'])
+        results.append({
+            'path': fixture['path'],
+            'seconds': time.perf_counter() - start,
+            'fields': parse_fields(text),
+        })
+
+    with open(output, 'w') as f:
+        json.dump({
+            'quantization': ModelSingleton.get_instance().quantization,
+            'load_seconds': load_seconds,
+            'peak_rss_mb': peak_rss_mb(),
+            'results': results,
+        }, f, indent=2)
+
+
+def run_mode(mode: str, fixtures_dir: str) -> dict:
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as tmp:
+        output = tmp.name
+    try:
+        env = dict(os.environ, MODEL_QUANTIZATION=mode)
+        subprocess.run(
+            [sys.executable, '-m', 'benchmarks.quantization_check',
+             '--worker', '--fixtures', fixtures_dir, '--output', output],
+            env=env, check=True
+        )
+        with open(output) as f:
+            return json.load(f)
+    finally:
+        os.remove(output)
+
+
+def score(run: dict, baseline: dict, fixtures: dict) -> float:
+    baseline_fields = {r['path']: r['fields'] for r in baseline['results']}
+    scores = []
+    for result in run['results']:
+        reference = fixtures[result['path']]['expected'] or baseline_fields.get(result['path'])
+        accuracy = field_accuracy(result['fields'], reference)
+        if accuracy is not None:
+            scores.append(accuracy)
+    return sum(scores) / len(scores) if scores else 0.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', default='image_documents')
+    parser.add_argument('--modes', nargs='+', default=['none', 'int8', 'bf16'])
+    parser.add_argument('--max-drop', type=float, default=0.05)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.fixtures, args.output)
+        return 0
+
+    fixtures = {f['path']: f for f in load_fixtures(args.fixtures)}
+    if not fixtures:
+        print(f"No fixtures found under {args.fixtures}")
+        return 1
+
+    runs = {mode: run_mode(mode, args.fixtures) for mode in dict.fromkeys(['none'] + args.modes)}
+    baseline = runs['none']
+    baseline_score = score(baseline, baseline, fixtures)
+
+    failed = False
+    print(f"{'mode':<6} {'applied':<8} {'load s':>7} {'mean s':>7} {'peak MB':>8} {'accuracy':>9}")
+    for mode, run in runs.items():
+        seconds = [r['seconds'] for r in run['results']]
+        accuracy = score(run, baseline, fixtures)
+        print(
+            f"{mode:<6} {run['quantization']:<8} {run['load_seconds']:>7.1f} "
+            f"{sum(seconds) / len(seconds):>7.2f} {run['peak_rss_mb']:>8.0f} {accuracy:>9.3f}"
+        )
+        if baseline_score - accuracy > args.max_drop:
+            failed = True
+
+    if failed:
+        print(f"Accuracy dropped by more than {args.max_drop:.2f} for at least one mode")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,6 +4,7 @@ from telegram import Update
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ConversationHandler, Defaults
 from dotenv import load_dotenv
 from controller.controller import TelegramController, UPLOAD_ID, UPLOAD_LICENSE, UPLOAD_LOG
+from services.session_persistence import CachedPersistence, SQLiteSessionStore
 
 # Load environment variables
 load_dotenv()
@@ -17,28 +18,59 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 def main() -> None:
+    controller = TelegramController()
+    if controller.inference_pool.forks_workers:
+        # Fork the workers while the process is still single threaded; they cannot be
+        # started from post_init, where the event loop and HTTP threads already run
+        controller.inference_pool.start()
+
+    # Conversation states and extracted data survive restarts
+    persistence = CachedPersistence(
+        SQLiteSessionStore(os.getenv('SESSION_DB_PATH', os.path.join('data', 'sessions.db'))),
+        update_interval=float(os.getenv('SESSION_PERSIST_INTERVAL', 5))
+    )
+
     # Initialize application with default timeouts
     application = (
         Application.builder()
         .token(os.getenv('TELEGRAM_BOT_API'))
+        .persistence(persistence)
+        # Load and warm the model in the background while polling starts
+        .post_init(controller.post_init)
         .read_timeout(int(os.getenv('TELEGRAM_READ_TIMEOUT', 30)))
         .write_timeout(int(os.getenv('TELEGRAM_WRITE_TIMEOUT', 30)))
         .connect_timeout(int(os.getenv('TELEGRAM_CONNECT_TIMEOUT', 20)))
         .pool_timeout(int(os.getenv('TELEGRAM_TIMEOUT', 30)))
+        # Session data lives in context.user_data, so updates can be handled concurrently
+        .concurrent_updates(int(os.getenv('TELEGRAM_CONCURRENT_UPDATES', 64)))
         .build()
     )
-    
-    controller = TelegramController()
+
+    document_handler = MessageHandler(filters.PHOTO, controller.handle_document, block=False)
+    start_handler = CommandHandler('start', controller.start)
+    cancel_handler = CommandHandler('cancel', controller.cancel)
 
     # Create conversation handler
     conv_handler = ConversationHandler(
-        entry_points=[CommandHandler('start', controller.start)],
+        entry_points=[start_handler],
         states={
-            UPLOAD_ID: [MessageHandler(filters.PHOTO, controller.handle_id_card)],
-            UPLOAD_LICENSE: [MessageHandler(filters.PHOTO, controller.handle_drivers_license)],
-            UPLOAD_LOG: [MessageHandler(filters.PHOTO, controller.handle_log_card)],
+            # Every state accepts any document; the state only tracks the next one expected.
+            # Non-blocking so other updates keep flowing while documents are processed
+            UPLOAD_ID: [document_handler],
+            UPLOAD_LICENSE: [document_handler],
+            UPLOAD_LOG: [document_handler],
+            # While a handler is still running only these are checked: fallbacks and entry
+            # points are not, so /start and /cancel are repeated here. Covers photos such
+            # as the rest of an album too
+            ConversationHandler.WAITING: [start_handler, cancel_handler, document_handler],
         },
-        fallbacks=[CommandHandler('cancel', controller.cancel)],
+        fallbacks=[cancel_handler],
+        # The state returned by a WAITING handler is discarded, so /start must always restart.
+        # Onboarding finishes in a background task, after which the next photo ends the
+        # conversation (TelegramController._end_conversation)
+        allow_reentry=True,
+        name='onboarding',
+        persistent=True,
     )
 
     # Add conversation handler
@@ -46,7 +78,11 @@ def main() -> None:
 
     # Start the bot
     logger.info("Bot started successfully!")
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    try:
+        application.run_polling(allowed_updates=Update.ALL_TYPES)
+    finally:
+        controller.inference_pool.shutdown()
+        controller.result_cache.close()
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -1,53 +1,153 @@
 from telegram import Update, File
 from telegram.ext import ContextTypes, ConversationHandler
-from model import process_document, validate_image
+from model import decode_image, validate_image, assess_quality, InferencePool
+from model.image_loading import decode_longest_edge, resolution_mode
+from model.near_duplicates import NearDuplicateIndex, dhash
+from model.result_cache import ResultCache, extraction_fingerprint, result_cache_key
 from view.view import TelegramView
 from telegram.error import TimedOut, NetworkError
 import os
+import re
 import time
 import logging
 import asyncio
 from typing import Tuple, Optional
 from datetime import datetime
-import shutil
 from services.monday_service import MondayService
 
 logger = logging.getLogger(__name__)
 
 # Define conversation states
 UPLOAD_ID, UPLOAD_LICENSE, UPLOAD_LOG = range(3)
+# Documents in the order they are assigned to photos without a caption
+DOCUMENT_TYPES = ('id_card', 'license', 'log_card')
+DOCUMENT_NAMES = {'id_card': "ID Card", 'license': "Driver's License", 'log_card': "Log Card"}
+# Caption users are asked to add when resending a document
+DOCUMENT_CAPTIONS = {'id_card': "ID", 'license': "License", 'log_card': "Log Card"}
+# Conversation state while a document type is the next one expected
+DOCUMENT_STATES = {'id_card': UPLOAD_ID, 'license': UPLOAD_LICENSE, 'log_card': UPLOAD_LOG}
+# Caption word prefixes naming a document, checked in this order
+CAPTION_KEYWORDS = {
+    'log_card': ('log',),
+    'license': ('licen', 'driv'),
+    'id_card': ('id', 'identity', 'nric'),
+}
 MAX_RETRIES = 3
 RETRY_DELAY = 2
+INFERENCE_TIMEOUT = float(os.getenv('INFERENCE_TIMEOUT', 300))  # 5 minutes
+SESSION_TTL = float(os.getenv('SESSION_TTL', 3600))  # Drop abandoned sessions after an hour
+SESSION_SWEEP_INTERVAL = 60
+# Telegram's standard photo size; the model's processor scales inputs to 1536px regardless
+PHOTO_MIN_EDGE = int(os.getenv('PHOTO_MIN_EDGE', 1280))
+# Reject blurry, badly exposed or glare-covered photos before inference. Off until its
+# thresholds are calibrated on real uploads (python -m benchmarks.quality_calibration)
+QUALITY_GATE = os.getenv('QUALITY_GATE', '0') != '0'
+
+
+def select_photo_size(photos, min_edge: int = PHOTO_MIN_EDGE):
+    """The smallest of a message's PhotoSizes whose longest edge reaches min_edge, otherwise the largest."""
+    by_area = sorted(photos, key=lambda photo: photo.width * photo.height)
+    return next((photo for photo in by_area if max(photo.width, photo.height) >= min_edge), by_area[-1])
+
+
+def _write_file(path: str, data: bytes) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+    except Exception as e:
+        logger.error(f"Failed to archive image {path}: {str(e)}")
+
+
 class TelegramController:
     def __init__(self) -> None:
         self.view = TelegramView()
         self.monday_service = MondayService()
-        self.extracted_data = {}
-    async def download_with_retry(self, photo, user_id: int, doc_type: str, max_retries: int = 3) -> Tuple[str, str]:
-        """Download photo with retry mechanism and save to both temp and permanent locations."""
+        self.inference_pool = InferencePool.get_instance()
+        self.result_cache = ResultCache.get_instance()
+        self.near_duplicates = NearDuplicateIndex.get_instance()
+        self._last_session_sweep = 0.0
+        self._background_tasks = set()
+        # user_id -> document type -> processing task
+        self._document_tasks = {}
+        # user_id -> the one task that saves the user's documents once all are in
+        self._finishers = {}
+        # Users whose data is being sent to Monday.com; new photos are refused meanwhile
+        self._saving = set()
+
+    def _session(self, context: ContextTypes.DEFAULT_TYPE) -> dict:
+        """Return this user's extracted data, kept in context.user_data so concurrent sessions stay isolated."""
+        context.user_data['last_active'] = time.time()
+        return context.user_data.setdefault('extracted_data', {})
+
+    def _received(self, context: ContextTypes.DEFAULT_TYPE) -> list:
+        """Document types this user has sent a photo for, in the order received, whether or not they succeeded."""
+        return context.user_data.setdefault('received_documents', [])
+
+    def _reconcile_received(self, user_id: int, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        Forget received documents that were neither extracted nor have a task
+        in this process. received_documents is persisted but the tasks are
+        not, so after a restart they would otherwise count as in progress
+        forever. A failed document keeps its finished task until
+        _complete_onboarding asks for it again.
+        """
+        received = self._received(context)
+        extracted_data = self._session(context)
+        tasks = self._document_tasks.get(user_id, {})
+        lost = [doc_type for doc_type in received if doc_type not in extracted_data and doc_type not in tasks]
+        if lost:
+            logger.info(f"Documents {', '.join(lost)} of user {user_id} have no task, asking for them again")
+            received[:] = [doc_type for doc_type in received if doc_type not in lost]
+
+    def _end_session(self, context: ContextTypes.DEFAULT_TYPE) -> None:
+        context.user_data.pop('extracted_data', None)
+        context.user_data.pop('received_documents', None)
+        context.user_data.pop('last_active', None)
+        context.user_data.pop('conversation_ended', None)
+
+    def _end_conversation(self, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        Mark the conversation as over where returning ConversationHandler.END
+        does not end it: from a background task, or from a command handled
+        while a non-blocking handler is pending, whose returned state
+        python-telegram-bot discards. The user's next photo is answered by
+        handle_document returning END, and /start clears the mark.
+        """
+        context.user_data['conversation_ended'] = True
+
+    def _evict_stale_sessions(self, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Drop user_data of sessions idle for longer than SESSION_TTL."""
+        now = time.time()
+        if now - self._last_session_sweep < SESSION_SWEEP_INTERVAL:
+            return
+        self._last_session_sweep = now
+
+        application = context.application
+        stale = [
+            user_id for user_id, data in application.user_data.items()
+            if now - data.get('last_active', now) > SESSION_TTL
+        ]
+        for user_id in stale:
+            self._cancel_documents(user_id)
+            self._saving.discard(user_id)
+            application.drop_user_data(user_id)
+        if stale:
+            logger.info(f"Evicted {len(stale)} stale session(s)")
+    async def download_with_retry(self, photo, user_id: int, doc_type: str, max_retries: int = MAX_RETRIES) -> Tuple[bytes, str]:
+        """Download photo into memory with retry mechanism."""
         for attempt in range(max_retries):
             try:
-                # Create directories if they don't exist
-                temp_dir = os.path.join('temp_documents')
-                perm_dir = os.path.join('image_documents', doc_type)
-                os.makedirs(temp_dir, exist_ok=True)
-                os.makedirs(perm_dir, exist_ok=True)
-
-                # Generate unique filenames
+                # Generate unique filename
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                 filename = f"{user_id}_{timestamp}.jpg"
-                temp_path = os.path.join(temp_dir, filename)
-                saved_path = os.path.join(perm_dir, filename)
 
                 # Download file
                 file = await photo.get_file()
-                await file.download_to_drive(temp_path)
+                data = bytes(await file.download_as_bytearray())
 
-                # Copy to permanent storage
-                shutil.copy2(temp_path, saved_path)
-
-                logger.info(f"Successfully downloaded and saved image. Temp: {temp_path}, Saved: {saved_path}")
-                return saved_path, temp_path
+                logger.info(f"Successfully downloaded image {filename} ({photo.width}x{photo.height}, {len(data)} bytes)")
+                return data, filename
 
             except Exception as e:
                 logger.error(f"Download attempt {attempt + 1} failed: {str(e)}")
@@ -56,194 +156,311 @@ class TelegramController:
 
         raise ValueError("Failed to download image after maximum retries")
 
+    def _archive_image(self, data: bytes, doc_type: str, filename: str) -> None:
+        """Persist the permanent copy under image_documents/<doc_type> without blocking the handler."""
+        saved_path = os.path.join('image_documents', doc_type, filename)
+        task = asyncio.create_task(asyncio.to_thread(_write_file, saved_path, data))
+        # Hold a reference until the write finishes
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _load_image(self, data: bytes, longest_edge: int):
+        """Decode the downloaded bytes once and validate them; returns (image or None, message)."""
+        try:
+            image = await asyncio.to_thread(decode_image, data, longest_edge)
+        except Exception as e:
+            return None, f"Invalid image: {str(e)}"
+
+        is_valid, message = validate_image(image, len(data))
+        return (image if is_valid else None), message
+
+    async def _receive_photo(self, update: Update, user_id: int, doc_type: str):
+        """
+        Download the smallest photo size that is large enough for the model
+        and check that it is good enough to read. Returns the decoded image
+        and its bytes, or (None, None) after notifying the user.
+        """
+        min_edge = PHOTO_MIN_EDGE
+        longest_edge = decode_longest_edge(doc_type)
+        if resolution_mode(doc_type) == 'tiled':
+            # Tiled documents are read from as many pixels as the photo has
+            min_edge = longest_edge
+        # Larger sizes are rescaled copies of the same photo: no sharper, and any size
+        # reaching min_edge passes validate_image, so there is nothing to fall back to
+        photo = select_photo_size(update.message.photo, min_edge)
+        data, filename = await self.download_with_retry(photo, user_id, doc_type)
+        image, message = await self._load_image(data, longest_edge)
+        if image is None:
+            logger.error(f"Image validation failed: {message}")
+            await self.view.send_validation_error(update, message)
+            return None, None
+
+        self._archive_image(data, doc_type, filename)
+        if QUALITY_GATE:
+            is_usable, message = await asyncio.to_thread(assess_quality, image)
+            if not is_usable:
+                await self.view.send_quality_error(update, message)
+                return None, None
+        return image, data
+
+    async def post_init(self, application) -> None:
+        """Load and warm the model in the background once the application starts."""
+        self.inference_pool.start_in_background()
+
+    async def _extract_document(self, update: Update, image, data: bytes, doc_type: str) -> str:
+        """
+        Return the cached result for these image bytes or for a near-duplicate
+        photo the user already sent, otherwise run inference off the event
+        loop, bounded by INFERENCE_TIMEOUT.
+        """
+        fingerprint = extraction_fingerprint(doc_type)
+        cache_key = None
+        if self.result_cache.enabled:
+            cache_key = result_cache_key(data, fingerprint)
+            cached = await asyncio.to_thread(self.result_cache.get, cache_key)
+            stats = self.result_cache.stats()
+            logger.info(
+                f"Result cache {'hit' if cached is not None else 'miss'} for {doc_type} "
+                f"(hit rate {stats['hit_rate']:.0%} over {stats['hits'] + stats['misses']} lookups)"
+            )
+            if cached is not None:
+                return cached
+
+        user_id = update.effective_user.id
+        image_hash = None
+        if self.near_duplicates.enabled:
+            image_hash = await asyncio.to_thread(dhash, image)
+            duplicate = self.near_duplicates.lookup(user_id, doc_type, image_hash, fingerprint)
+            if duplicate is not None:
+                return duplicate
+
+        extracted_text = await self._run_inference(update, image, doc_type)
+
+        # Only successful extractions ('Field: value' lines) are cached, so a retry after a failure runs again
+        if extracted_text and ':' in extracted_text:
+            if cache_key is not None:
+                await asyncio.to_thread(self.result_cache.put, cache_key, extracted_text)
+            if image_hash is not None:
+                self.near_duplicates.add(user_id, doc_type, image_hash, fingerprint, extracted_text)
+        return extracted_text
+
+    async def _run_inference(self, update: Update, image, doc_type: str) -> str:
+        if not self.inference_pool.is_ready:
+            # Queue behind the startup warm-up instead of failing
+            await self.view.send_model_loading_message(update)
+            await self.inference_pool.wait_until_ready()
+
+        return await asyncio.wait_for(
+            self.inference_pool.run(image, doc_type),
+            timeout=INFERENCE_TIMEOUT
+        )
+
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+        self._evict_stale_sessions(context)
+        self._cancel_documents(update.effective_user.id)
+        self._end_session(context)
+        self._session(context)
         await self.view.send_welcome_message(update)
         return UPLOAD_ID
 
-    async def handle_id_card(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
-        user = update.message.from_user
-        photo = update.message.photo[-1]
-        
-        await self.view.send_processing_message(update, "ID Card")
-        
-        try:
-            saved_path, temp_path = await self.download_with_retry(photo, user.id, 'id_card')
-            if not saved_path or not temp_path:
-                raise ValueError("Failed to download image")
-            
-            await self.view.send_model_loading_message(update)
-            
-            is_valid, message = validate_image(saved_path)
-            if not is_valid:
-                logger.error(f"Image validation failed: {message}")
-                await self.view.send_validation_error(update, message)
-                return UPLOAD_ID
-            
-            try:
-                # Process document with longer timeout
-                extracted_text = await asyncio.wait_for(
-                    asyncio.to_thread(process_document, saved_path, 'id_card'),
-                    timeout=300.0  # 5 minutes timeout
-                )
-                
-                if extracted_text and "No data found" not in extracted_text:
-                    # Parse the extracted text into a dictionary
-                    data_dict = {}
-                    for line in extracted_text.split('\n'):
-                        if ':' in line:
-                            key, value = line.split(':', 1)
-                            data_dict[key.strip()] = value.strip()
-                    self.extracted_data['id_card'] = data_dict
-                    await self.view.send_extracted_text(update, "ID Card", extracted_text)
-                    await self.view.request_next_document(update, "Driver's License")
-                    
-                    if os.path.exists(temp_path):
-                        os.remove(temp_path)
-                    
-                    return UPLOAD_LICENSE
-                else:
-                    raise ValueError("Failed to extract data from ID Card")
-                    
-            except asyncio.TimeoutError:
-                logger.error("ID card processing timed out")
-                await self.view.send_error_message(update, "Processing took too long. Please try again.")
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                return UPLOAD_ID
-                
-        except Exception as e:
-            logger.error(f"Error processing ID Card: {str(e)}")
-            await self.view.send_error_message(update, "Failed to process ID Card. Please try again.")
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            return UPLOAD_ID
+    def _document_type_for(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> Optional[str]:
+        """
+        The caption's document type, otherwise the first one no photo was
+        received for; None when all are in. A failed document only becomes
+        unreceived again once _complete_onboarding asks for it, so a photo
+        sent right after a failure is not mistaken for the failed document.
+        """
+        words = re.findall(r"[a-z]+", (update.message.caption or '').lower())
+        for doc_type, keywords in CAPTION_KEYWORDS.items():
+            if any(word.startswith(keywords) for word in words):
+                return doc_type
 
-    async def handle_drivers_license(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
-        user = update.message.from_user
-        photo = update.message.photo[-1]
-        
-        await self.view.send_processing_message(update, "Driver's License")
-        
-        try:
-            saved_path, temp_path = await self.download_with_retry(photo, user.id, 'license')
-            if not saved_path or not temp_path:
-                raise ValueError("Failed to download image")
-            
-            is_valid, message = validate_image(saved_path)
-            if not is_valid:
-                logger.error(f"Image validation failed: {message}")
-                await self.view.send_validation_error(update, message)
-                return UPLOAD_LICENSE
-            
-            extracted_text = process_document(saved_path, 'license')
-            # Parse the extracted text into a dictionary
-            data_dict = {}
-            for line in extracted_text.split('\n'):
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    data_dict[key.strip()] = value.strip()
-            self.extracted_data['license'] = data_dict
-            await self.view.send_extracted_text(update, "Driver's License", extracted_text)
-            await self.view.request_next_document(update, "Log Card")
-            
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-                
+        received = self._received(context)
+        return next((doc_type for doc_type in DOCUMENT_TYPES if doc_type not in received), None)
+
+    def _cancel_documents(self, user_id: int) -> None:
+        for task in self._document_tasks.pop(user_id, {}).values():
+            task.cancel()
+        finisher = self._finishers.pop(user_id, None)
+        if finisher is not None:
+            finisher.cancel()
+
+    def _start_finisher(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """
+        Start _complete_onboarding unless it already runs for this user. A
+        document resent while it waits is picked up by the running one, so
+        the data is saved exactly once.
+        """
+        user_id = update.effective_user.id
+        finisher = self._finishers.get(user_id)
+        if finisher is not None and not finisher.done():
+            return
+        self._finishers[user_id] = context.application.create_task(
+            self._complete_onboarding(update, context), update=update
+        )
+
+    async def handle_document(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+        """
+        Accept any of the three documents, in any order or as an album, and
+        process it in the background so the next photo is received while
+        the model works. Runs without awaiting until the document is claimed,
+        so photos of one album arriving together get distinct types.
+        """
+        if context.user_data.get('conversation_ended'):
+            await self.view.send_session_over(update)
+            return ConversationHandler.END
+
+        user_id = update.effective_user.id
+        if user_id in self._saving:
+            await self.view.send_documents_saving(update)
+            return UPLOAD_LOG
+
+        self._reconcile_received(user_id, context)
+        doc_type = self._document_type_for(update, context)
+        if doc_type is None:
+            # All documents were extracted; after a restart nothing is saving them yet
+            self._start_finisher(update, context)
+            await self.view.send_all_documents_received(update)
             return UPLOAD_LOG
-            
-        except Exception as e:
-            logger.error(f"Error processing image: {str(e)}")
-            await self.view.send_error_message(update, "Please try uploading the Driver's License photo again.")
-            return UPLOAD_LICENSE
 
-    async def handle_log_card(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+        tasks = self._document_tasks.setdefault(user_id, {})
+        previous = tasks.get(doc_type)
+        if previous is not None and not previous.done():
+            # A newer photo of the same document replaces the one in progress
+            previous.cancel()
+        self._session(context).pop(doc_type, None)
+        received = self._received(context)
+        if doc_type not in received:
+            received.append(doc_type)
+        tasks[doc_type] = context.application.create_task(
+            self._process_document(update, context, doc_type), update=update
+        )
+
+        missing = [doc_type for doc_type in DOCUMENT_TYPES if doc_type not in received]
+        if missing:
+            return DOCUMENT_STATES[missing[0]]
+        # Every document is in. Waiting here would keep the conversation pending (and
+        # /start or /cancel answered only from WAITING) for minutes, so a background task
+        # reports the outcome once they are processed
+        self._start_finisher(update, context)
+        return UPLOAD_LOG
+
+    async def _process_document(self, update: Update, context: ContextTypes.DEFAULT_TYPE, doc_type: str) -> bool:
+        """Download, extract and report one document; on failure the user is asked to send it again."""
         user = update.message.from_user
-        photo = update.message.photo[-1]
-        temp_path = None
-        
+        name = DOCUMENT_NAMES[doc_type]
+        caption = DOCUMENT_CAPTIONS[doc_type]
+
         try:
             # Wrap the processing message in try-except
             try:
-                await self.view.send_processing_message(update, "Log Card")
+                await self.view.send_processing_message(update, name)
             except TimedOut:
                 logger.warning("Timeout sending processing message, continuing anyway")
-            
-            saved_path, temp_path = await self.download_with_retry(photo, user.id, 'log_card')
-            if not saved_path or not temp_path:
-                raise ValueError("Failed to download image")
-            
-            is_valid, message = validate_image(saved_path)
-            if not is_valid:
-                logger.error(f"Image validation failed: {message}")
-                await self.view.send_validation_error(update, message)
-                return UPLOAD_LOG
-            
-            extracted_text = process_document(saved_path, 'log_card')
-            # Parse the extracted text into a dictionary
-            data_dict = {}
-            for line in extracted_text.split('\n'):
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    data_dict[key.strip()] = value.strip()
-            self.extracted_data['log_card'] = data_dict
-            
-            # Send data to Monday.com
-            if await self._send_to_monday():
+
+            image, data = await self._receive_photo(update, user.id, doc_type)
+            if image is None:
+                await self.view.request_resend(update, name, caption)
+                return False
+
+            extracted_text = await self._extract_document(update, image, data, doc_type)
+            if not extracted_text or "No data found" in extracted_text or ':' not in extracted_text:
+                raise ValueError(f"Failed to extract data from {name}")
+
+            self._session(context)[doc_type] = self._parse_fields(extracted_text)
+            await self.view.send_extracted_text(update, name, extracted_text)
+            return True
+
+        except asyncio.CancelledError:
+            logger.info(f"Processing of {name} for user {user.id} was superseded")
+            raise
+        except asyncio.TimeoutError:
+            logger.error(f"{name} processing timed out")
+            await self.view.send_error_message(update, "Processing took too long.")
+        except TimedOut:
+            logger.error("Connection timed out")
+            await asyncio.sleep(RETRY_DELAY)  # Wait before retrying
+            await self.view.send_error_message(update, "Connection timed out.")
+        except Exception as e:
+            logger.error(f"Error processing {name}: {str(e)}")
+            await self.view.send_error_message(update, f"Failed to process the {name}.")
+        await self.view.request_resend(update, name, caption)
+        return False
+
+    @staticmethod
+    def _parse_fields(extracted_text: str) -> dict:
+        """Parse the extracted text into a dictionary."""
+        data_dict = {}
+        for line in extracted_text.split('\n'):
+            if ':' in line:
+                key, value = line.split(':', 1)
+                data_dict[key.strip()] = value.strip()
+        return data_dict
+
+    async def _complete_onboarding(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Wait for every document of the user, including resent ones, then save the data or ask for what failed."""
+        user_id = update.effective_user.id
+        while True:
+            pending = [task for task in self._document_tasks.get(user_id, {}).values() if not task.done()]
+            if not pending:
+                break
+            await asyncio.wait(pending)
+
+        extracted_data = self._session(context)
+        missing = [doc_type for doc_type in DOCUMENT_TYPES if doc_type not in extracted_data]
+        if missing:
+            # Let a resend arriving from here on start a new finisher, and let photos
+            # without a caption fill the documents asked for
+            self._finishers.pop(user_id, None)
+            received = self._received(context)
+            received[:] = [doc_type for doc_type in received if doc_type not in missing]
+            await self.view.request_documents(update, [DOCUMENT_NAMES[doc_type] for doc_type in missing])
+            return
+
+        # Send data to Monday.com
+        self._saving.add(user_id)
+        try:
+            if await self._send_to_monday(extracted_data):
                 await self.view.send_data_saved_message(update)
             else:
                 await self.view.send_data_save_error_message(update)
-            
-            await self.view.send_extracted_text(update, "Log Card", extracted_text)
             await self.view.send_completion_message(update)
-            
-            # Clean up
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            self.extracted_data = {}
-                
-            return ConversationHandler.END
-            
-        except TimedOut:
-            logger.error("Connection timed out")
-            await asyncio.sleep(2)  # Wait before retrying
-            await self.view.send_error_message(
-                update, 
-                "Connection timed out. Please try again."
-            )
-            return UPLOAD_LOG
-        except Exception as e:
-            logger.error(f"Error processing image: {str(e)}")
-            await self.view.send_error_message(
-                update, 
-                "Please try uploading the Log Card photo again."
-            )
-            return UPLOAD_LOG
         finally:
-            if temp_path and os.path.exists(temp_path):
-                os.remove(temp_path)
+            self._saving.discard(user_id)
+
+        # Clean up. This runs outside any handler, so no state can be returned to end the conversation
+        self._document_tasks.pop(user_id, None)
+        self._finishers.pop(user_id, None)
+        self._end_session(context)
+        self._end_conversation(context)
 
     async def cancel(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+        self._cancel_documents(update.effective_user.id)
+        self._end_session(context)
+        # END below is discarded when /cancel arrives while a photo's handler is pending
+        self._end_conversation(context)
         await self.view.send_cancel_message(update)
         return ConversationHandler.END
 
 
 
-    async def _send_to_monday(self) -> bool:
+    async def _send_to_monday(self, extracted_data: dict) -> bool:
         """Combine all data and send to Monday.com."""
         try:
             # Log the data being combined for debugging
-            logger.debug("ID Card data: %s", self.extracted_data.get('id_card', {}))
-            logger.debug("License data: %s", self.extracted_data.get('license', {}))
-            logger.debug("Log Card data: %s", self.extracted_data.get('log_card', {}))
+            logger.debug("ID Card data: %s", extracted_data.get('id_card', {}))
+            logger.debug("License data: %s", extracted_data.get('license', {}))
+            logger.debug("Log Card data: %s", extracted_data.get('log_card', {}))
             
             combined_data = {}
             # Update in specific order to ensure correct data precedence
-            combined_data.update(self.extracted_data.get('id_card', {}))
-            combined_data.update(self.extracted_data.get('license', {}))
-            combined_data.update(self.extracted_data.get('log_card', {}))
+            combined_data.update(extracted_data.get('id_card', {}))
+            combined_data.update(extracted_data.get('license', {}))
+            combined_data.update(extracted_data.get('log_card', {}))
             
             logger.debug("Combined data being sent to Monday.com: %s", combined_data)
-            return self.monday_service.create_policy_item(combined_data)
+            # The Monday.com client is synchronous; keep it off the event loop
+            return await asyncio.to_thread(self.monday_service.create_policy_item, combined_data)
             
         except Exception as e:
             logger.error(f"Error sending data to Monday.com: {str(e)}")
@@ -1,4 +1,22 @@
-from .document_processor import process_document
-from .validators import validate_image
+import importlib
 
-__all__ = ['process_document', 'validate_image']
+# torch, transformers, cv2 and pytesseract are only imported once one of
+# these names is first used, so importing the package stays cheap
+_LAZY_ATTRIBUTES = {
+    'process_document': '.document_processor',
+    'decode_image': '.image_loading',
+    'validate_image': '.validators',
+    'assess_quality': '.quality',
+    'InferencePool': '.inference_pool',
+}
+
+__all__ = ['process_document', 'decode_image', 'validate_image', 'assess_quality', 'InferencePool']
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
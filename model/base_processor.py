@@ -1,6 +1,7 @@
 import pytesseract
 from PIL import Image, ImageEnhance
 import cv2
+import numpy as np
 import torch
 import logging
 import os
@@ -8,10 +9,35 @@ from abc import ABC, abstractmethod
 from transformers import AutoProcessor, AutoModelForVision2Seq
 from typing import Tuple, Optional
 from model.model_singleton import ModelSingleton
+from model.batch_engine import BatchInferenceEngine
+from model.decoding import get_decoding_profile
+from model.document_crop import crop_document
+from model.fields import merge_field_answers, parse_field_values
+from model.ocr import is_valid_value, read_fields
+from model.image_loading import MODEL_LONGEST_EDGE, VISION_TILE_SIZE, fit_to_model, resolution_mode, split_tiles, tile_grid
 
 logger = logging.getLogger(__name__)
 
+# A cropped card fills the frame, so it keeps more pixels per character at
+# this size than the full photo does at 1536px, with about half the image tiles
+CROPPED_LONGEST_EDGE = int(os.getenv('CROPPED_LONGEST_EDGE', 1152))
+
+# Asks the model for a subset of a document's fields
+FIELD_PROMPT = (
+    "Extract only the following fields from this document. Answer with one "
+    "'Field: value' line per field, using 'Not found' for fields that are not visible.\n{fields}"
+)
+
 class BaseDocumentProcessor(ABC):
+    # Should be set by child classes ('id_card', 'license' or 'log_card')
+    document_type = None
+    # Fields the model is expected to emit as 'Field: value' lines
+    FIELDS = ()
+    # Environment variable holding the document's prompt
+    PROMPT_ENV = None
+    # Fields that are asked for again when the first pass misses them or gets them wrong
+    REQUIRED_FIELDS = ()
+
     def __init__(self):
         try:
             # Get singleton instance
@@ -25,6 +51,9 @@ class BaseDocumentProcessor(ABC):
             
             if not all([self.model, self.processor, self.device]):
                 raise RuntimeError("Model components not properly initialized")
+            
+            # Shared engine that batches concurrent requests into one generate call
+            self.engine = BatchInferenceEngine.get_instance()
                 
         except Exception as e:
             logger.error(f"Failed to initialize document processor: {str(e)}")
@@ -36,16 +65,174 @@ class BaseDocumentProcessor(ABC):
         
         # Should be set by child classes
         self.prompt = None
+        
+        # generate() settings from the document type's decoding profile
+        self.generation_kwargs = get_decoding_profile(self.document_type)
+        # Stop decoding once every schema field has been emitted
+        self.schema_stopping = os.getenv('SCHEMA_STOPPING', '1') != '0'
+        # Encode only the document region instead of the whole photo
+        self.document_crop = os.getenv('DOCUMENT_CROP', '1') != '0'
+        # Read fields with Tesseract first and leave only the rest to the model
+        self.ocr_fast_path = os.getenv('OCR_FAST_PATH', '1') != '0'
+        # Re-prompt for missing or malformed required fields on the same image
+        self.re_extract = os.getenv('RE_EXTRACT_MISSING_FIELDS', '1') != '0'
+        # One model input per document, or overlapping tiles of a higher resolution photo
+        self.resolution = resolution_mode(self.document_type)
+        self.tile_grid = tile_grid(self.document_type)
+
+    def resize_for_model(self, image: Image.Image, longest_edge: Optional[int] = None) -> Image.Image:
+        """Resize to the exact input size of the model's image processor in a single pass."""
+        image_processor = getattr(self.processor, 'image_processor', None)
+        if longest_edge is None:
+            longest_edge = getattr(image_processor, 'size', {}).get('longest_edge', MODEL_LONGEST_EDGE)
+        tile_size = None
+        if getattr(image_processor, 'do_image_splitting', True):
+            tile_size = getattr(image_processor, 'max_image_size', {}).get('longest_edge', VISION_TILE_SIZE)
+        
+        resized = fit_to_model(image, longest_edge, tile_size)
+        if resized is not image:
+            logger.info(f"Resized image from {image.size} to {resized.size}")
+        return resized
+
+    def prepare_image(self, image: Image.Image) -> Tuple[Image.Image, Optional[int]]:
+        """
+        Crop to the document when its outline is found, then resize once for
+        the model. Returns the image and the longest edge the model's image
+        processor must keep it at (None for its default). In tiled mode the
+        image keeps its resolution; each tile is resized instead.
+        """
+        longest_edge = None
+        if self.document_crop:
+            cropped = crop_document(image)
+            if cropped is not None:
+                image = cropped
+                longest_edge = CROPPED_LONGEST_EDGE
+        if self.resolution == 'tiled':
+            return image, None
+        return self.resize_for_model(image, longest_edge), longest_edge
+
+    def is_stale(self) -> bool:
+        """True when the prompt or decoding profile changed since this processor was built."""
+        return (
+            self.prompt != os.getenv(self.PROMPT_ENV)
+            or self.generation_kwargs != get_decoding_profile(self.document_type)
+            or self.resolution != resolution_mode(self.document_type)
+            or self.tile_grid != tile_grid(self.document_type)
+        )
+
+    def generate_text(self, image: Image.Image, image_longest_edge: Optional[int] = None) -> str:
+        """Run the prompt against the image through the batching engine."""
+        fields = self.FIELDS if self.schema_stopping else None
+        return self.engine.generate(self.prompt, image, fields, image_longest_edge, **self.generation_kwargs)
+
+    def field_prompt(self, fields) -> str:
+        """A prompt for only the given fields, in the model's chat format."""
+        messages = [{
+            "role": "user",
+            "content": [
+                {"type": "image"},
+                {"type": "text", "text": FIELD_PROMPT.format(fields="\n".join(f"{field}:" for field in fields))},
+            ],
+        }]
+        return self.processor.apply_chat_template(messages, add_generation_prompt=True)
+
+    def generate_fields(self, image: Image.Image, fields, image_longest_edge: Optional[int] = None) -> str:
+        """Ask the model for the given fields only."""
+        return self.engine.generate(
+            self.field_prompt(fields), image, fields if self.schema_stopping else None,
+            image_longest_edge, **self.generation_kwargs
+        )
 
-    def preprocess_image(self, image_path: str) -> Optional[Image.Image]:
-        """Preprocess the image for better text extraction."""
+    def generate_tiled(self, image: Image.Image, fields) -> dict:
+        """
+        Ask for the given fields on overlapping tiles of the image, submitted
+        together so the engine runs them as one batch, and merge the answers
+        with merge_field_answers. Fields whose tiles disagree without a
+        winner are asked for once more on the whole image, which sees every
+        label.
+        """
+        tiles = [self.resize_for_model(tile) for tile in split_tiles(image, *self.tile_grid)]
+        prompt = self.field_prompt(fields)
+        futures = [
+            self.engine.submit(prompt, tile, fields if self.schema_stopping else None, None, **self.generation_kwargs)
+            for tile in tiles
+        ]
+        logger.info(f"Submitted {len(tiles)} tiles of {image.size} for {len(fields)} field(s)")
+
+        answers = [self.field_values(future.result()) for future in futures]
+        values, conflicts = merge_field_answers(
+            answers, lambda field, value: is_valid_value(self.document_type, field, value)
+        )
+        if conflicts:
+            logger.info(f"Tiles disagree on {', '.join(conflicts)}, reading them from the whole image")
+            whole = self.field_values(self.generate_fields(self.resize_for_model(image), list(conflicts)))
+            for field, tied in conflicts.items():
+                value = whole.get(field)
+                # The whole image settles the tie; a value it cannot read falls back to the first candidate
+                values[field] = value if is_valid_value(self.document_type, field, value) else tied[0]
+        return values
+
+    def ask_model(self, image: Image.Image, fields, image_longest_edge: Optional[int] = None, full_prompt: bool = False) -> dict:
+        """Field values from the model, through the configured prompt or a field prompt, on the image or its tiles."""
+        if self.resolution == 'tiled':
+            return self.generate_tiled(image, fields)
+        if full_prompt:
+            return self.field_values(self.generate_text(image, image_longest_edge))
+        return self.field_values(self.generate_fields(image, fields, image_longest_edge))
+
+    def field_values(self, text: str) -> dict:
+        """Parse 'Field: value' lines of this document's fields, keeping the last non-empty value of each."""
+        return parse_field_values(text, self.FIELDS)
+
+    def extract_text(self, image: Image.Image, image_longest_edge: Optional[int] = None) -> str:
+        """
+        Read the document's fields as 'Field: value' lines. With the OCR fast
+        path, Tesseract reads the fields it can match confidently and the
+        model is only asked for the rest, or skipped when nothing is left.
+        Required fields the model misses or gets malformed are asked for once
+        more, on their own, on the same image.
+        """
+        ocr_fields = {}
+        if self.ocr_fast_path:
+            preprocessed = self.preprocess_image(image)
+            if preprocessed is not None:
+                ocr_fields = read_fields(preprocessed, self.document_type)
+
+        values = {field: ocr_fields[field] for field in self.FIELDS if field in ocr_fields}
+        missing = [field for field in self.FIELDS if field not in values]
+        if not missing:
+            logger.info("All fields read by OCR, skipping the model")
+        else:
+            if values:
+                logger.info(f"Asking the model for {len(missing)} field(s): {', '.join(missing)}")
+            generated = self.ask_model(image, missing, image_longest_edge, full_prompt=not values)
+            values.update((field, generated[field]) for field in missing if field in generated)
+
+        retry = [
+            field for field in missing
+            if field in self.REQUIRED_FIELDS and not is_valid_value(self.document_type, field, values.get(field))
+        ]
+        if retry and self.re_extract:
+            logger.info(f"Re-extracting {', '.join(retry)}")
+            generated = self.ask_model(image, retry, image_longest_edge)
+            for field, value in generated.items():
+                # Keep the first answer unless the second one is well-formed
+                if field in retry and (field not in values or is_valid_value(self.document_type, field, value)):
+                    values[field] = value
+
+        return "\n".join(f"{field}: {values[field]}" for field in self.FIELDS if field in values)
+
+    def preprocess_image(self, image) -> Optional[Image.Image]:
+        """Preprocess the image (decoded image or path) for better text extraction."""
         try:
-            if not os.path.exists(image_path):
-                raise FileNotFoundError(f"Image not found: {image_path}")
-                
-            img = cv2.imread(image_path)
-            if img is None:
-                raise ValueError(f"Failed to read image: {image_path}")
+            if isinstance(image, Image.Image):
+                img = cv2.cvtColor(np.asarray(image.convert('RGB')), cv2.COLOR_RGB2BGR)
+            else:
+                if not os.path.exists(image):
+                    raise FileNotFoundError(f"Image not found: {image}")
+                img = cv2.imread(image)
+                if img is None:
+                    raise ValueError(f"Failed to read image: {image}")
                 
             # Convert to grayscale
             gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
@@ -82,13 +269,16 @@ class BaseDocumentProcessor(ABC):
         except Exception as e:
             logger.error(f"Error in cleanup: {str(e)}")
 
-    def verify_image(self, image_path: str) -> Optional[Image.Image]:
-        """Verify and load image."""
+    def verify_image(self, image) -> Optional[Image.Image]:
+        """Verify and load image from an already decoded image or a path."""
         try:
-            if not os.path.exists(image_path):
-                raise FileNotFoundError(f"Image not found: {image_path}")
-                
-            original_image = Image.open(image_path)
+            if isinstance(image, Image.Image):
+                original_image = image
+            else:
+                if not os.path.exists(image):
+                    raise FileNotFoundError(f"Image not found: {image}")
+                original_image = Image.open(image)
+            
             if original_image.mode != 'RGB':
                 original_image = original_image.convert('RGB')
                 
@@ -99,8 +289,8 @@ class BaseDocumentProcessor(ABC):
             return None
 
     @abstractmethod
-    def process_image(self, image_path: str) -> Tuple[str, str]:
-        """Process the image and extract text."""
+    def process_image(self, image) -> Tuple[str, str]:
+        """Process the image (decoded image or path) and extract text."""
         pass
 
     @abstractmethod
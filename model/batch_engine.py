@@ -0,0 +1,183 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from queue import Queue, Empty
+from typing import Any, Dict, List, Optional, Sequence
+
+import torch
+from transformers import StoppingCriteriaList
+
+from model.embedding_cache import VisionEmbeddingCache
+from model.model_singleton import ModelSingleton
+from model.schema_stopping import FieldSchemaStoppingCriteria
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceRequest:
+    """A single prompt/image pair waiting to be batched."""
+
+    def __init__(self, prompt: str, image, generation_kwargs: Dict[str, Any], fields: Optional[Sequence[str]] = None,
+                 image_longest_edge: Optional[int] = None):
+        self.prompt = prompt
+        self.image = image
+        # Expected output fields; generation stops early once all are emitted
+        self.fields = fields
+        # Longest edge the image processor scales to, when not its default
+        self.image_longest_edge = image_longest_edge
+        self.generation_kwargs = generation_kwargs
+        # Only requests with identical generate() and image processor settings can share a batch
+        self.batch_key = (image_longest_edge,) + tuple(sorted(generation_kwargs.items()))
+        self.future: Future = Future()
+
+
+class BatchInferenceEngine:
+    """
+    Collects concurrent inference requests and runs them through the shared
+    model as a single padded batch.
+
+    A batch is closed once it holds INFERENCE_MAX_BATCH_SIZE requests or
+    INFERENCE_MAX_WAIT_MS milliseconds have passed since its first request.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, max_batch_size: Optional[int] = None, max_wait_ms: Optional[float] = None):
+        if max_batch_size is None:
+            max_batch_size = int(os.getenv('INFERENCE_MAX_BATCH_SIZE', 8))
+        if max_wait_ms is None:
+            max_wait_ms = float(os.getenv('INFERENCE_MAX_WAIT_MS', 50))
+
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        # Vision encoder outputs, reused by later passes over the same image
+        self.embedding_cache = VisionEmbeddingCache() if os.getenv('EMBEDDING_CACHE', '1') != '0' else None
+
+        self._queue: Queue = Queue()
+        # Requests pulled off the queue that did not fit the current batch
+        self._deferred: List[InferenceRequest] = []
+
+        self._worker = threading.Thread(target=self._run, name="batch-inference", daemon=True)
+        self._worker.start()
+        logger.info(
+            f"Batch inference engine started (max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait * 1000:.0f})"
+        )
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
+    def submit(self, prompt: str, image, fields: Optional[Sequence[str]] = None,
+               image_longest_edge: Optional[int] = None, **generation_kwargs) -> Future:
+        """Queue a request and return a future resolving to the decoded text."""
+        request = InferenceRequest(prompt, image, generation_kwargs, fields, image_longest_edge)
+        self._queue.put(request)
+        return request.future
+
+    def generate(self, prompt: str, image, fields: Optional[Sequence[str]] = None,
+                 image_longest_edge: Optional[int] = None, **generation_kwargs) -> str:
+        """Blocking helper around submit()."""
+        return self.submit(prompt, image, fields, image_longest_edge, **generation_kwargs).result()
+
+    def _collect_batch(self) -> List[InferenceRequest]:
+        """Block for the first request, then gather compatible ones until full or timed out."""
+        first = self._deferred.pop(0) if self._deferred else self._queue.get()
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+
+        still_deferred = []
+        for request in self._deferred:
+            if len(batch) < self.max_batch_size and request.batch_key == first.batch_key:
+                batch.append(request)
+            else:
+                still_deferred.append(request)
+        self._deferred = still_deferred
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except Empty:
+                break
+            if request.batch_key == first.batch_key:
+                batch.append(request)
+            else:
+                self._deferred.append(request)
+
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = [r for r in self._collect_batch() if r.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                texts = self._generate_batch(batch)
+            except Exception as e:
+                logger.error(f"Batch generation failed for {len(batch)} request(s): {str(e)}")
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            for request, text in zip(batch, texts):
+                request.future.set_result(text)
+
+    def _generate_batch(self, batch: List[InferenceRequest]) -> List[str]:
+        model_singleton = ModelSingleton.get_instance()
+        model = model_singleton.model
+        processor = model_singleton.processor
+
+        # Decoder-only generation needs prompts aligned on the right
+        processor.tokenizer.padding_side = "left"
+
+        start = time.perf_counter()
+        image_kwargs = {}
+        if batch[0].image_longest_edge:
+            # Otherwise the image processor scales smaller images back up to its default
+            image_kwargs['size'] = {'longest_edge': batch[0].image_longest_edge}
+        inputs = processor(
+            text=[request.prompt for request in batch],
+            images=[[request.image] for request in batch],
+            return_tensors="pt",
+            padding=True,
+            **image_kwargs
+        ).to(model_singleton.device)
+
+        generation_kwargs = dict(batch[0].generation_kwargs)
+        if any(request.fields for request in batch):
+            generation_kwargs['stopping_criteria'] = StoppingCriteriaList([
+                FieldSchemaStoppingCriteria(
+                    processor.tokenizer,
+                    inputs['input_ids'].shape[1],
+                    [request.fields for request in batch],
+                    generation_kwargs.get('num_beams', 1)
+                )
+            ])
+
+        # Cached embeddings are laid out per image, which beam expansion in generate() does not preserve
+        if self.embedding_cache is not None and generation_kwargs.get('num_beams', 1) == 1:
+            keys = [VisionEmbeddingCache.image_key(r.image, r.image_longest_edge) for r in batch]
+            image_hidden_states = self.embedding_cache.encode(model, inputs, keys)
+            if image_hidden_states is not None:
+                inputs.pop('pixel_values')
+                inputs.pop('pixel_attention_mask', None)
+                generation_kwargs['image_hidden_states'] = image_hidden_states
+
+        with torch.no_grad():
+            output_ids = model.generate(**inputs, **generation_kwargs)
+
+        # generate() returns the prompt followed by the answer; decode only the answer, or the
+        # prompt's own 'Field:' lines and its trailing 'Assistant:' end up in the parsed text
+        texts = processor.batch_decode(output_ids[:, inputs['input_ids'].shape[1]:], skip_special_tokens=True)
+        logger.info(f"Generated batch of {len(batch)} in {time.perf_counter() - start:.2f}s")
+        return texts
@@ -0,0 +1,53 @@
+import logging
+import os
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+# Named generate() settings. Greedy is the fast path: one hypothesis and
+# deterministic output; the beam profiles trade latency for accuracy.
+DECODING_PROFILES: Dict[str, Dict[str, Any]] = {
+    'fast-greedy': {
+        "max_new_tokens": 128,
+        "num_beams": 1,
+        "do_sample": False,
+        "repetition_penalty": 1.2
+    },
+    'accurate-beam': {
+        "max_new_tokens": 128,
+        "num_beams": 3,
+        "do_sample": False,
+        "length_penalty": 1.0,
+        "repetition_penalty": 1.2
+    },
+    # Settings used before profiles existed
+    'sampled-beam': {
+        "max_new_tokens": 128,
+        "num_beams": 2,
+        "temperature": 0.3,
+        "do_sample": True,
+        "length_penalty": 1.0,
+        "repetition_penalty": 1.2
+    },
+}
+
+DEFAULT_DECODING_PROFILE = 'fast-greedy'
+
+
+def get_profile_name(document_type: str) -> str:
+    """
+    Resolve the profile for a document type from <TYPE>_DECODING_PROFILE
+    (e.g. LOG_CARD_DECODING_PROFILE), then DECODING_PROFILE, then the default.
+    """
+    name = os.getenv(f"{document_type.upper()}_DECODING_PROFILE") or os.getenv('DECODING_PROFILE')
+    if not name:
+        return DEFAULT_DECODING_PROFILE
+    if name not in DECODING_PROFILES:
+        logger.warning(f"Unknown decoding profile '{name}' for {document_type}, using {DEFAULT_DECODING_PROFILE}")
+        return DEFAULT_DECODING_PROFILE
+    return name
+
+
+def get_decoding_profile(document_type: str) -> Dict[str, Any]:
+    """Return a copy of the generate() kwargs configured for a document type."""
+    return dict(DECODING_PROFILES[get_profile_name(document_type)])
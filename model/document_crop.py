@@ -0,0 +1,95 @@
+import logging
+import os
+from typing import List, Optional
+
+import cv2
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Contours are searched on a copy scaled to this longest edge; the warp
+# itself runs on the full-resolution image
+CROP_WORKING_EDGE = 800
+# The outline must cover at least this share of the frame to count as the document
+MIN_DOCUMENT_AREA = float(os.getenv('DOCUMENT_CROP_MIN_AREA', 0.2))
+# Grow the detected outline slightly so text along the card's edge is kept
+CROP_MARGIN = 0.02
+
+
+def _order_corners(points: np.ndarray) -> np.ndarray:
+    """Order four (x, y) points as top-left, top-right, bottom-right, bottom-left."""
+    ordered = np.zeros((4, 2), dtype=np.float32)
+    sums = points.sum(axis=1)
+    diffs = np.diff(points, axis=1).ravel()
+    ordered[0] = points[np.argmin(sums)]
+    ordered[1] = points[np.argmin(diffs)]
+    ordered[2] = points[np.argmax(sums)]
+    ordered[3] = points[np.argmax(diffs)]
+    return ordered
+
+
+def document_contours(gray: np.ndarray) -> List[np.ndarray]:
+    """
+    Closed edge contours of a greyscale photo, largest first. Both the crop
+    and the quality gate (model/quality.py) look for the document here.
+    """
+    edges = cv2.Canny(cv2.GaussianBlur(gray, (5, 5), 0), 50, 150)
+    # Close small gaps in the outline so the card forms one contour
+    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8), iterations=2)
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return sorted(contours, key=cv2.contourArea, reverse=True)
+
+
+def find_document_corners(image: Image.Image) -> Optional[np.ndarray]:
+    """
+    Locate the document as the largest convex quadrilateral edge contour.
+    Returns its corners in full-resolution coordinates, or None.
+    """
+    gray = np.asarray(image.convert('L'))
+    scale = min(1.0, CROP_WORKING_EDGE / max(gray.shape))
+    if scale < 1:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    min_area = MIN_DOCUMENT_AREA * gray.shape[0] * gray.shape[1]
+    for contour in document_contours(gray)[:5]:
+        if cv2.contourArea(contour) < min_area:
+            break
+        approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(approx) == 4 and cv2.isContourConvex(approx):
+            return _order_corners(approx.reshape(4, 2).astype(np.float32) / scale)
+    return None
+
+
+def crop_document(image: Image.Image) -> Optional[Image.Image]:
+    """
+    Cut the document out of the photo and warp it to a fronto-parallel
+    rectangle. Returns None when no document outline is found, in which case
+    the full frame should be used.
+    """
+    try:
+        corners = find_document_corners(image)
+        if corners is None:
+            logger.info("No document outline found, using the full frame")
+            return None
+
+        center = corners.mean(axis=0)
+        corners = center + (corners - center) * (1 + CROP_MARGIN)
+        corners[:, 0] = corners[:, 0].clip(0, image.size[0] - 1)
+        corners[:, 1] = corners[:, 1].clip(0, image.size[1] - 1)
+
+        top_left, top_right, bottom_right, bottom_left = corners
+        width = int(max(np.linalg.norm(top_right - top_left), np.linalg.norm(bottom_right - bottom_left)))
+        height = int(max(np.linalg.norm(bottom_left - top_left), np.linalg.norm(bottom_right - top_right)))
+        target = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+
+        transform = cv2.getPerspectiveTransform(corners.astype(np.float32), target)
+        warped = cv2.warpPerspective(
+            np.asarray(image), transform, (width, height),
+            flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE
+        )
+        logger.info(f"Cropped document from {image.size} to {(width, height)}")
+        return Image.fromarray(warped)
+    except Exception as e:
+        logger.error(f"Document crop failed, using the full frame: {str(e)}")
+        return None
@@ -2,25 +2,40 @@ from model.id_card_processor import IDCardProcessor
 from model.license_processor import LicenseProcessor
 from model.log_card_processor import LogCardProcessor
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
 class DocumentProcessorFactory:
-    @staticmethod
-    def get_processor(document_type):
-        if document_type == 'id_card':
-            return IDCardProcessor()
-        elif document_type == 'license':
-            return LicenseProcessor()
-        elif document_type == 'log_card':
-            return LogCardProcessor()
-        else:
+    _processor_classes = {
+        'id_card': IDCardProcessor,
+        'license': LicenseProcessor,
+        'log_card': LogCardProcessor,
+    }
+    # One long-lived processor per document type
+    _instances = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_processor(cls, document_type):
+        processor_class = cls._processor_classes.get(document_type)
+        if processor_class is None:
             raise ValueError(f"Unsupported document type: {document_type}")
 
-def process_document(image_path, document_type='id_card'):
+        with cls._lock:
+            processor = cls._instances.get(document_type)
+            if processor is None or processor.is_stale():
+                if processor is not None:
+                    logger.info(f"Configuration changed, reloading {document_type} processor")
+                processor = processor_class()
+                cls._instances[document_type] = processor
+            return processor
+
+def process_document(image, document_type='id_card'):
+    """Extract fields from a decoded PIL image or an image path."""
     try:
         processor = DocumentProcessorFactory.get_processor(document_type)
-        result = processor.process_image(image_path)
+        result = processor.process_image(image)
         
         # If result is a tuple, take the first element
         if isinstance(result, tuple):
@@ -0,0 +1,97 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+class VisionEmbeddingCache:
+    """
+    Caches the vision encoder's output (after the modality connector) per
+    image, keyed by a hash of the image's pixels and the size it is encoded
+    at. Another pass over the same image, such as a field re-extraction or a
+    different prompt, then skips the vision encoder and hands generate() the
+    cached image_hidden_states instead of pixel_values.
+
+    Entries are evicted least recently used first once their tensors exceed
+    max_bytes (EMBEDDING_CACHE_MB).
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('EMBEDDING_CACHE_MB', 512)) * 1024 * 1024)
+        self.max_bytes = max(0, max_bytes)
+        self._entries: "OrderedDict[str, torch.Tensor]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def image_key(image, longest_edge: Optional[int] = None) -> str:
+        digest = hashlib.blake2b(image.tobytes(), digest_size=20)
+        digest.update(f"{image.mode}:{image.size}:{longest_edge}".encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _tile_counts(pixel_values: torch.Tensor) -> List[int]:
+        """Real (non-padding) images per row; the model drops all-zero padding images before encoding."""
+        return [int((row != 0).flatten(1).any(dim=1).sum()) for row in pixel_values]
+
+    def _store(self, key: str, features: torch.Tensor) -> None:
+        size = features.element_size() * features.nelement()
+        if size > self.max_bytes:
+            return
+        self._entries[key] = features
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.element_size() * evicted.nelement()
+
+    def encode(self, model, inputs, keys: List[str]) -> Optional[torch.Tensor]:
+        """
+        Return image_hidden_states for a batch, one key per row, encoding only
+        the rows not cached yet. Returns None when the model does not expose
+        its image encoder, in which case generate() encodes as usual.
+        """
+        encoder = getattr(getattr(model, 'model', None), 'get_image_features', None)
+        pixel_values = inputs.get('pixel_values')
+        if encoder is None or pixel_values is None:
+            return None
+        pixel_attention_mask = inputs.get('pixel_attention_mask')
+
+        with self._lock:
+            features = [self._entries.get(key) for key in keys]
+            for key, cached in zip(keys, features):
+                if cached is not None:
+                    self._entries.move_to_end(key)
+
+        missing = [i for i, cached in enumerate(features) if cached is None]
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            rows = torch.tensor(missing, device=pixel_values.device)
+            with torch.no_grad():
+                encoded = encoder(
+                    pixel_values=pixel_values[rows],
+                    pixel_attention_mask=pixel_attention_mask[rows] if pixel_attention_mask is not None else None
+                )
+            encoded = encoded.split(self._tile_counts(pixel_values[rows]))
+
+            with self._lock:
+                for i, row_features in zip(missing, encoded):
+                    features[i] = row_features
+                    # split() returns views that would keep the whole batch's output alive
+                    self._store(keys[i], row_features.clone())
+
+        logger.info(
+            f"Vision embeddings: {len(keys) - len(missing)}/{len(keys)} cached "
+            f"({self._bytes / 1024 / 1024:.0f} MB in {len(self._entries)} entries)"
+        )
+        return torch.cat(features)
@@ -0,0 +1,59 @@
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Kept free of torch/transformers imports so the parsing can be used (and
+# tested) without loading the model stack
+
+
+def parse_field_values(text: str, fields: Sequence[str]) -> Dict[str, str]:
+    """
+    Parse the model's 'Field: value' lines for the given fields, keeping the
+    last non-empty value of each. A line echoing the chat template's
+    'Assistant:' turn marker is read from after the marker.
+    """
+    by_key = {field.lower(): field for field in fields}
+    values = {}
+    for line in text.split('\n'):
+        if ':' not in line:
+            continue
+        key, value = line.split(':', 1)
+        if key.strip().lower() == 'assistant' and ':' in value:
+            key, value = value.split(':', 1)
+        field = by_key.get(key.strip().rstrip('.').lower())
+        value = value.strip()
+        if field and value and value.lower() != 'not found':
+            values[field] = value
+    return values
+
+
+def _normalize(value: str) -> str:
+    return ' '.join(value.lower().split())
+
+
+def merge_field_answers(
+    answers: Sequence[Dict[str, str]], is_valid: Callable[[str, str], bool]
+) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+    """
+    Merge the answers of several reads of one document, such as its tiles.
+
+    A tile that cannot see a field often still answers with a plausible
+    value, so the order of the answers decides nothing. Per field, values
+    that pass is_valid(field, value) beat those that do not, then values
+    more answers agree on (ignoring case and whitespace) win. Returns the
+    decided values and, for fields where different values tie, the tied
+    candidates.
+    """
+    candidates: Dict[str, Dict[str, List[str]]] = {}
+    for answer in answers:
+        for field, value in answer.items():
+            candidates.setdefault(field, {}).setdefault(_normalize(value), []).append(value)
+
+    values, conflicts = {}, {}
+    for field, groups in candidates.items():
+        ranks = {key: (is_valid(field, group[0]), len(group)) for key, group in groups.items()}
+        best = max(ranks.values())
+        tied = [groups[key][0] for key, rank in ranks.items() if rank == best]
+        if len(tied) == 1:
+            values[field] = tied[0]
+        else:
+            conflicts[field] = tied
+    return values, conflicts
@@ -10,61 +10,47 @@ from datetime import datetime
 logger = logging.getLogger(__name__)
 
 class IDCardProcessor(BaseDocumentProcessor):
+    document_type = 'id_card'
+    PROMPT_ENV = 'ID_CARD_PROMPT'
+    FIELDS = (
+        "Name",
+        "Race",
+        "Date of birth",
+        "Sex",
+        "Country/Place of birth",
+        "ID Number"
+    )
+    REQUIRED_FIELDS = ("Name", "Date of birth", "ID Number")
+
     def __init__(self):
         super().__init__()
-        self.prompt = os.getenv('ID_CARD_PROMPT')
+        self.prompt = os.getenv(self.PROMPT_ENV)
         if not self.prompt:
             logger.error("ID_CARD_PROMPT environment variable is required but not set")
             raise ValueError("ID_CARD_PROMPT environment variable is required")
 
-    def process_image(self, image_path):
+    def process_image(self, image):
         try:
-            logger.info(f"Processing image: {image_path}")
+            logger.info("Processing image")
             
-            original_image = self.verify_image(image_path)
+            original_image = self.verify_image(image)
             if original_image is None:
                 return "Image verification failed"
             
             logger.info(f"Image opened successfully: {original_image.size}")
             
             try:
-                # Optimize image size if too large
-                max_size = 1024
-                if original_image.size[0] > max_size or original_image.size[1] > max_size:
-                    ratio = max_size / max(original_image.size)
-                    new_size = tuple([int(dim * ratio) for dim in original_image.size])
-                    original_image = original_image.resize(new_size, Image.Resampling.LANCZOS)
-                    logger.info(f"Resized image to: {original_image.size}")
+                # Crop to the document, then a single resize to the size the model's image processor works at
+                original_image, longest_edge = self.prepare_image(original_image)
 
-                logger.info("Preparing model inputs...")
-                inputs = self.processor(
-                    text=[self.prompt],
-                    images=[original_image],
-                    return_tensors="pt",
-                    padding=True
-                ).to(self.device)
+                generated_text = self.extract_text(original_image, longest_edge)
+                logger.info(f"Raw generated text: {generated_text}")
                 
-                logger.info("Starting model inference...")
-                with torch.no_grad():
-                    # Set shorter max_new_tokens for faster processing
-                    output_ids = self.model.generate(
-                        **inputs,
-                        max_new_tokens=128,  # Reduced from 256
-                        num_beams=2,         # Reduced from 3
-                        temperature=0.3,
-                        do_sample=True,
-                        length_penalty=1.0,
-                        repetition_penalty=1.2
-                    )
-                    
-                    generated_text = self.processor.batch_decode(output_ids, skip_special_tokens=True)[0]
-                    logger.info(f"Raw generated text: {generated_text}")
-                    
-                    formatted_text = self.format_text(generated_text)
-                    logger.info(f"Formatted output: {formatted_text}")
-                    
-                    return formatted_text
+                formatted_text = self.format_text(generated_text)
+                logger.info(f"Formatted output: {formatted_text}")
                 
+                return formatted_text
+            
             except Exception as e:
                 logger.error(f"Generation error: {str(e)}")
                 return "Text generation failed"
@@ -79,14 +65,7 @@ class IDCardProcessor(BaseDocumentProcessor):
     def format_text(self, text: str) -> str:
         try:
             # Initialize with required fields
-            formatted_data = {
-                "Name": "",
-                "Race": "",
-                "Date of birth": "",
-                "Sex": "",
-                "Country/Place of birth": "",
-                "ID Number": ""
-            }
+            formatted_data = {field: "" for field in self.FIELDS}
             
             # Process lines
             lines = text.split('\n')
@@ -0,0 +1,118 @@
+import io
+import logging
+import math
+import os
+from typing import List, Optional, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# SmolVLM-Instruct's image processor resizes the longest edge to 1536px and
+# then rounds both sides up to whole 384px vision-encoder tiles
+MODEL_LONGEST_EDGE = 1536
+VISION_TILE_SIZE = 384
+
+# Photos are decoded at no more than this size (see decode_image)
+DECODE_LONGEST_EDGE = int(os.getenv('DECODE_LONGEST_EDGE', MODEL_LONGEST_EDGE))
+
+# 'single' feeds a document to the model as one image; 'tiled' keeps more
+# pixels and feeds it as overlapping tiles, each at the model's full input size
+RESOLUTION_MODES = ('single', 'tiled')
+TILED_DECODE_LONGEST_EDGE = int(os.getenv('TILED_DECODE_LONGEST_EDGE', 2 * MODEL_LONGEST_EDGE))
+TILE_OVERLAP = float(os.getenv('TILE_OVERLAP', 0.15))
+
+
+def resolution_mode(document_type: str) -> str:
+    """Resolution policy of a document type from <TYPE>_RESOLUTION (e.g. LOG_CARD_RESOLUTION)."""
+    mode = os.getenv(f"{document_type.upper()}_RESOLUTION", 'single').lower()
+    if mode not in RESOLUTION_MODES:
+        logger.warning(f"Unknown resolution mode '{mode}' for {document_type}, using single")
+        return 'single'
+    return mode
+
+
+def decode_longest_edge(document_type: str) -> int:
+    """Size photos of a document type are decoded at."""
+    return TILED_DECODE_LONGEST_EDGE if resolution_mode(document_type) == 'tiled' else DECODE_LONGEST_EDGE
+
+
+def tile_grid(document_type: str) -> Tuple[int, int]:
+    """(rows, columns) from <TYPE>_TILE_GRID, e.g. '2x1' for two full-width strips (the default)."""
+    grid = os.getenv(f"{document_type.upper()}_TILE_GRID", '2x1')
+    try:
+        rows, columns = (max(1, int(n)) for n in grid.lower().split('x'))
+    except ValueError:
+        logger.warning(f"Invalid tile grid '{grid}' for {document_type}, using 2x1")
+        return 2, 1
+    return rows, columns
+
+
+def split_tiles(image: Image.Image, rows: int, columns: int, overlap: float = TILE_OVERLAP) -> List[Image.Image]:
+    """Cut the image into a rows x columns grid of tiles overlapping by a share of a tile, in reading order."""
+    def spans(length: int, count: int):
+        tile = length / (count - (count - 1) * overlap)
+        step = tile * (1 - overlap)
+        return [(round(i * step), min(length, round(i * step + tile))) for i in range(count)]
+
+    return [
+        image.crop((left, top, right, bottom))
+        for top, bottom in spans(image.size[1], rows)
+        for left, right in spans(image.size[0], columns)
+    ]
+
+
+def decode_image(data: bytes, longest_edge: Optional[int] = DECODE_LONGEST_EDGE) -> Image.Image:
+    """
+    Decode an uploaded photo from memory into an RGB image, once, for
+    validation and inference.
+
+    JPEGs are decoded in draft mode: libjpeg scales them down by 1/2, 1/4 or
+    1/8 during the DCT, to the smallest scale that still keeps the longest
+    edge at or above longest_edge, so a 12MP photo is never fully decoded.
+    """
+    image = Image.open(io.BytesIO(data))
+    if longest_edge and image.format == 'JPEG' and max(image.size) > longest_edge:
+        scale = longest_edge / max(image.size)
+        image.draft('RGB', (math.ceil(image.size[0] * scale), math.ceil(image.size[1] * scale)))
+    image.load()
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return image
+
+
+def model_input_size(size: Tuple[int, int], longest_edge: int = MODEL_LONGEST_EDGE,
+                     tile_size: Optional[int] = VISION_TILE_SIZE) -> Tuple[int, int]:
+    """(width, height) the model's image processor ends up with for an image of this size."""
+    width, height = size
+    aspect_ratio = width / height
+    if width >= height:
+        width = longest_edge
+        height = int(width / aspect_ratio)
+        height += height % 2
+    else:
+        height = longest_edge
+        width = int(height * aspect_ratio)
+        width += width % 2
+
+    if tile_size:
+        aspect_ratio = width / height
+        if width >= height:
+            width = math.ceil(width / tile_size) * tile_size
+            height = math.ceil(int(width / aspect_ratio) / tile_size) * tile_size
+        else:
+            height = math.ceil(height / tile_size) * tile_size
+            width = math.ceil(int(height * aspect_ratio) / tile_size) * tile_size
+    return max(width, 1), max(height, 1)
+
+
+def fit_to_model(image: Image.Image, longest_edge: int = MODEL_LONGEST_EDGE,
+                 tile_size: Optional[int] = VISION_TILE_SIZE) -> Image.Image:
+    """
+    Resize once, straight to the model's input size, so the image processor's
+    own resize steps become no-ops instead of a second lossy resample.
+    """
+    target = model_input_size(image.size, longest_edge, tile_size)
+    if image.size == target:
+        return image
+    return image.resize(target, Image.Resampling.LANCZOS)
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# The model stack (torch, transformers, cv2) is imported inside the functions
+# below so that importing this module does not slow down bot startup
+
+
+def _process_document(image, document_type: str) -> str:
+    from model.document_processor import process_document
+    return process_document(image, document_type)
+
+
+def _init_worker(num_threads: int) -> None:
+    """Pin intra-op threads and make sure the worker holds a loaded, warm model."""
+    import torch
+    from model.model_singleton import ModelSingleton
+    from model.warmup import warm_up_model
+
+    torch.set_num_threads(num_threads)
+    # A forked worker inherits the parent's already loaded singleton, so this
+    # is a no-op there; spawned workers load their own copy here
+    ModelSingleton.get_instance()
+    warm_up_model()
+    logger.info(f"Inference worker {os.getpid()} ready with {num_threads} thread(s)")
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class InferencePool:
+    """
+    Runs process_document in a pool of worker processes.
+
+    INFERENCE_WORKERS sets the pool size; 0 (the default) keeps inference in a
+    thread of the bot process. With the "fork" start method the model is loaded
+    once in the parent and its weights are moved to shared memory before the
+    workers are forked, so every worker maps the same read-only tensors instead
+    of holding a private copy. Spawned workers load their own model, but when
+    MODEL_SNAPSHOT_DIR is set they memory-map the same snapshot files and share
+    the page cache, so spawn is the default then.
+
+    Nothing is loaded until start() runs. Forking is only safe while the
+    process is single threaded, so with forked workers start() must run
+    before polling starts; otherwise start_in_background() runs it on a
+    thread at bot startup and exposes readiness to the handlers.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, workers: Optional[int] = None):
+        if workers is None:
+            workers = int(os.getenv('INFERENCE_WORKERS', 0))
+        self.workers = max(0, workers)
+        default_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        if os.getenv('MODEL_SNAPSHOT_DIR'):
+            # Spawned workers share the memory-mapped snapshot and can start in the background
+            default_method = 'spawn'
+        self.start_method = os.getenv('INFERENCE_START_METHOD', default_method)
+        self._executor = None
+        self._ready = None
+        self._started = False
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
+    @property
+    def forks_workers(self) -> bool:
+        """Whether start() forks worker processes and so must run before any other thread starts."""
+        return self.workers > 0 and self.start_method == 'fork'
+
+    def _start_processes(self) -> None:
+        start_method = self.start_method
+        num_threads = max(1, (os.cpu_count() or 1) // self.workers)
+
+        if start_method == 'fork':
+            from model.model_singleton import ModelSingleton
+
+            if threading.active_count() > 1:
+                # Children may deadlock on locks (e.g. logging's) held by other threads at fork time
+                logger.warning(f"Forking inference workers with {threading.active_count()} threads running")
+
+            # Load (but never run) the model before forking; running it first
+            # would start OpenMP threads that do not survive a fork
+            model_singleton = ModelSingleton.get_instance()
+            if os.getenv('MODEL_SNAPSHOT_DIR'):
+                # Memory-mapped snapshot weights are already shared through the page
+                # cache; share_memory() would copy them into shared memory
+                logger.info("Forked workers share the memory-mapped snapshot weights")
+            else:
+                model_singleton.model.share_memory()
+                logger.info("Model weights moved to shared memory for forked workers")
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_init_worker,
+            initargs=(num_threads,)
+        )
+
+        # Start every worker now so they are loaded and warm before the first request
+        pids = {f.result() for f in [self._executor.submit(_ping) for _ in range(self.workers)]}
+        logger.info(f"Started {self.workers} inference worker(s) via {start_method}: {sorted(pids)}")
+
+    def start(self) -> None:
+        """Load and warm the model, in worker processes or in this process."""
+        if self._started:
+            return
+        self._started = True
+
+        start = time.perf_counter()
+        if self.workers > 0:
+            self._start_processes()
+        else:
+            from model.model_singleton import ModelSingleton
+            from model.warmup import warm_up_model
+
+            ModelSingleton.get_instance()
+            warm_up_model()
+        logger.info(f"Inference ready after {time.perf_counter() - start:.1f}s")
+
+    def start_in_background(self) -> None:
+        """
+        Run start() on a thread; must be called from the running event loop.
+        A no-op once start() has run, as it must have for forked workers.
+        """
+        if self._started:
+            return
+        if self.forks_workers:
+            # Forking now, with the event loop and HTTP threads running, could deadlock the workers
+            logger.warning("Forked inference workers were not started before polling; running inference in this process")
+            return
+        self._ready = asyncio.Event()
+        asyncio.get_running_loop().create_task(self._start_async())
+
+    async def _start_async(self) -> None:
+        try:
+            await asyncio.to_thread(self.start)
+        except Exception as e:
+            # Requests fall back to loading the model on first use
+            logger.error(f"Model warm-up failed: {str(e)}")
+        finally:
+            self._ready.set()
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready is None or self._ready.is_set()
+
+    async def wait_until_ready(self) -> None:
+        if self._ready is not None:
+            await self._ready.wait()
+
+    async def run(self, image, document_type: str) -> str:
+        """Process a decoded image (or image path) on a pool worker or a thread without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, _process_document, image, document_type)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -10,58 +10,64 @@ from datetime import datetime
 logger = logging.getLogger(__name__)
 
 class LogCardProcessor(BaseDocumentProcessor):
+    document_type = 'log_card'
+    PROMPT_ENV = 'LOG_CARD_PROMPT'
+    # All possible fields that are visible in the log card
+    FIELDS = (
+        "Vehicle No", 
+        "Make/Model",  # ALFA ROMEO / ALFA 159 2.2JTS.SPORTWAGON.SELESPEED
+        "Vehicle Type",
+        "Vehicle Attachment 1",  # No Attachment
+        "Vehicle Scheme",
+        "Chassis No",  # ZAR93900007269184
+        "Propellant",
+        "Engine No",  # 939A50001741061
+        "Motor No",
+        "Engine Capacity",  # 2198 cc
+        "Power Rating",
+        "Maximum Power Output",  # 136.0 kW (182 bhp)
+        "Maximum Laden Weight",
+        "Unladen Weight",  # 1540 kg
+        "Year Of Manufacture",
+        "Original Registration Date",  # 03 Jun 2010
+        "Lifespan Expiry Date",
+        "COE Category",  # B - Car (1601cc & above)
+        "PQP Paid",
+        "COE Expiry Date",  # 30 Apr 2029
+        "Road Tax Expiry Date",
+        "PARF Eligibility Expiry Date",  # -
+        "Inspection Due Date",
+        "Intended Transfer Date"  # 01 May 2023
+    )
+    REQUIRED_FIELDS = ("Vehicle No", "Make/Model", "Chassis No", "Engine No")
+
     def __init__(self):
         super().__init__()
-        self.prompt = os.getenv('LOG_CARD_PROMPT')
+        self.prompt = os.getenv(self.PROMPT_ENV)
         if not self.prompt:
             logger.error("LOG_CARD_PROMPT environment variable is required but not set")
             raise ValueError("LOG_CARD_PROMPT environment variable is required")
 
-    def process_image(self, image_path):
+    def process_image(self, image):
         try:
-            logger.info(f"Processing log card image: {image_path}")
+            logger.info("Processing log card image")
             
-            original_image = self.verify_image(image_path)
+            original_image = self.verify_image(image)
             if original_image is None:
                 return "Image verification failed"
             
             logger.info(f"Image opened successfully: {original_image.size}")
             
             try:
-                # Optimize image size if too large
-                max_size = 1024
-                if original_image.size[0] > max_size or original_image.size[1] > max_size:
-                    ratio = max_size / max(original_image.size)
-                    new_size = tuple([int(dim * ratio) for dim in original_image.size])
-                    original_image = original_image.resize(new_size, Image.Resampling.LANCZOS)
-                    logger.info(f"Resized image to: {original_image.size}")
+                # Crop to the document, then a single resize to the size the model's image processor works at
+                original_image, longest_edge = self.prepare_image(original_image)
 
-                logger.info("Preparing model inputs...")
-                inputs = self.processor(
-                    text=[self.prompt],
-                    images=[original_image],
-                    return_tensors="pt",
-                    padding=True
-                ).to(self.device)
-                
-                logger.info("Starting model inference...")
-                with torch.no_grad():
-                    output_ids = self.model.generate(
-                        **inputs,
-                        max_new_tokens=128,
-                        num_beams=2,
-                        temperature=0.3,
-                        do_sample=True,
-                        length_penalty=1.0,
-                        repetition_penalty=1.2
-                    )
-                    
-                    generated_text = self.processor.batch_decode(output_ids, skip_special_tokens=True)[0]
-                    formatted_text = self.format_text(generated_text)
-                    logger.info(f"Formatted output: {formatted_text}")
-                    
-                    return formatted_text
+                generated_text = self.extract_text(original_image, longest_edge)
+                formatted_text = self.format_text(generated_text)
+                logger.info(f"Formatted output: {formatted_text}")
                 
+                return formatted_text
+            
             except Exception as e:
                 logger.error(f"Generation error: {str(e)}")
                 return "Text generation failed"
@@ -80,36 +86,8 @@ class LogCardProcessor(BaseDocumentProcessor):
             lines = text.split('\n')
             formatted_data = {}
             
-            # Define all possible fields that are visible in the log card
-            fields = [
-                "Vehicle No", 
-                "Make/Model",  # ALFA ROMEO / ALFA 159 2.2JTS.SPORTWAGON.SELESPEED
-                "Vehicle Type",
-                "Vehicle Attachment 1",  # No Attachment
-                "Vehicle Scheme",
-                "Chassis No",  # ZAR93900007269184
-                "Propellant",
-                "Engine No",  # 939A50001741061
-                "Motor No",
-                "Engine Capacity",  # 2198 cc
-                "Power Rating",
-                "Maximum Power Output",  # 136.0 kW (182 bhp)
-                "Maximum Laden Weight",
-                "Unladen Weight",  # 1540 kg
-                "Year Of Manufacture",
-                "Original Registration Date",  # 03 Jun 2010
-                "Lifespan Expiry Date",
-                "COE Category",  # B - Car (1601cc & above)
-                "PQP Paid",
-                "COE Expiry Date",  # 30 Apr 2029
-                "Road Tax Expiry Date",
-                "PARF Eligibility Expiry Date",  # -
-                "Inspection Due Date",
-                "Intended Transfer Date"  # 01 May 2023
-            ]
-            
             # Initialize all fields with "Not found"
-            formatted_data = {field: "Not found" for field in fields}
+            formatted_data = {field: "Not found" for field in self.FIELDS}
             
             # Process each line
             for line in lines:
@@ -0,0 +1,29 @@
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Kept free of torch/transformers imports so the bot process can describe
+# the model without loading it
+MODEL_NAME = "HuggingFaceTB/SmolVLM-Instruct"
+SNAPSHOT_MANIFEST = 'snapshot.json'
+
+
+def model_version() -> str:
+    """
+    Identify the weights and numerics the workers run with, from the snapshot
+    manifest when MODEL_SNAPSHOT_DIR is set, otherwise from MODEL_REVISION.
+    """
+    snapshot_dir = os.getenv('MODEL_SNAPSHOT_DIR')
+    if snapshot_dir:
+        try:
+            with open(os.path.join(snapshot_dir, SNAPSHOT_MANIFEST)) as f:
+                manifest = json.load(f)
+            version = f"{manifest.get('model')}@{manifest.get('revision')}:{manifest.get('dtype')}"
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read snapshot manifest in {snapshot_dir}: {str(e)}")
+            version = f"snapshot:{os.path.abspath(snapshot_dir)}"
+    else:
+        version = f"{MODEL_NAME}@{os.getenv('MODEL_REVISION') or 'main'}"
+    return f"{version}/{os.getenv('MODEL_QUANTIZATION', 'none').lower()}"
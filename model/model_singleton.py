@@ -1,15 +1,57 @@
-from transformers import AutoProcessor, AutoModelForVision2Seq
+from transformers import AutoConfig, AutoProcessor, AutoModelForVision2Seq
+from safetensors.torch import load_file
 import torch
 import logging
+import contextlib
+import glob
+import json
+import os
+from model.model_info import MODEL_NAME, SNAPSHOT_MANIFEST
 
 logger = logging.getLogger(__name__)
 
+QUANTIZATION_MODES = ('none', 'int8', 'bf16')
+
+
+def _cpu_supports_bf16() -> bool:
+    """Check for native bf16 instructions; emulated bf16 is slower than fp32."""
+    try:
+        with open('/proc/cpuinfo') as f:
+            flags = f.read()
+        return 'avx512_bf16' in flags or 'amx_bf16' in flags
+    except OSError:
+        return False
+
+@contextlib.contextmanager
+def _empty_parameters():
+    """
+    Create module parameters on the meta device so building the model does not
+    allocate (and randomly initialise) weights that the snapshot replaces.
+    Buffers are still created normally, since non-persistent ones such as
+    rotary frequencies are not stored in the snapshot.
+    """
+    register_parameter = torch.nn.Module.register_parameter
+
+    def register_empty_parameter(module, name, param):
+        register_parameter(module, name, param)
+        if param is not None:
+            module._parameters[name] = torch.nn.Parameter(
+                module._parameters[name].to('meta'), requires_grad=param.requires_grad
+            )
+
+    torch.nn.Module.register_parameter = register_empty_parameter
+    try:
+        yield
+    finally:
+        torch.nn.Module.register_parameter = register_parameter
+
 class ModelSingleton:
     _instance = None
     _initialized = False
     _model = None
     _processor = None
     _device = None
+    _quantization = 'none'
 
     def __new__(cls):
         if cls._instance is None:
@@ -28,28 +70,111 @@ class ModelSingleton:
             self._device = "cuda" if torch.cuda.is_available() else "cpu"
             logger.info(f"Using device: {self._device}")
 
+            snapshot_dir = os.getenv('MODEL_SNAPSHOT_DIR')
+
             # Load processor and model only if not already loaded
             if self._processor is None:
-                self._processor = AutoProcessor.from_pretrained(
-                    "HuggingFaceTB/SmolVLM-Instruct",
-                    trust_remote_code=True
-                )
+                if snapshot_dir:
+                    self._processor = AutoProcessor.from_pretrained(snapshot_dir, local_files_only=True)
+                else:
+                    self._processor = AutoProcessor.from_pretrained(
+                        MODEL_NAME,
+                        revision=os.getenv('MODEL_REVISION'),
+                        trust_remote_code=True
+                    )
                 logger.info("Processor loaded successfully")
 
             if self._model is None:
-                self._model = AutoModelForVision2Seq.from_pretrained(
-                    "HuggingFaceTB/SmolVLM-Instruct",
-                    trust_remote_code=True
-                )
+                quantization = self._resolve_quantization()
+                dtype = torch.bfloat16 if quantization == 'bf16' else torch.float32
+                if snapshot_dir:
+                    self._model = self._load_snapshot(snapshot_dir, dtype)
+                else:
+                    self._model = AutoModelForVision2Seq.from_pretrained(
+                        MODEL_NAME,
+                        revision=os.getenv('MODEL_REVISION'),
+                        trust_remote_code=True,
+                        torch_dtype=dtype
+                    )
                 self._model.to(self._device)
                 self._model.eval()  # Set to evaluation mode
-                logger.info("Model loaded successfully")
+
+                if quantization == 'int8':
+                    # Dynamic quantization: int8 weights, activations quantized on the fly
+                    self._model = torch.quantization.quantize_dynamic(
+                        self._model, {torch.nn.Linear}, dtype=torch.qint8
+                    )
+                self._quantization = quantization
+                logger.info(f"Model loaded successfully (quantization: {quantization})")
 
         except Exception as e:
             self._initialized = False  # Reset initialization flag on failure
             logger.error(f"Failed to load model: {str(e)}")
             raise
 
+    def _load_snapshot(self, snapshot_dir: str, dtype: torch.dtype):
+        """
+        Build the model from a local snapshot (see model/snapshot.py) without
+        touching the hub. Weights are assigned straight from memory-mapped
+        safetensors files, so they are not copied into private memory and
+        every process loading the snapshot shares the same page cache.
+        """
+        manifest_path = os.path.join(snapshot_dir, SNAPSHOT_MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            logger.info(f"Loading snapshot of {manifest.get('model')}@{manifest.get('revision')} ({manifest.get('dtype')})")
+
+        config = AutoConfig.from_pretrained(snapshot_dir, local_files_only=True)
+        with _empty_parameters():
+            model = AutoModelForVision2Seq.from_config(config, torch_dtype=dtype)
+
+        weight_files = sorted(glob.glob(os.path.join(snapshot_dir, '*.safetensors')))
+        if not weight_files:
+            raise FileNotFoundError(f"No safetensors weights in {snapshot_dir}")
+
+        state_dict = {}
+        for weight_file in weight_files:
+            state_dict.update(load_file(weight_file))
+
+        # assign=True keeps the source tensors' dtype, so weights stored in another
+        # precision than the one requested would silently run in it; convert them
+        converted = 0
+        for name, tensor in state_dict.items():
+            if tensor.is_floating_point() and tensor.dtype != dtype:
+                state_dict[name] = tensor.to(dtype)
+                converted += 1
+        if converted:
+            logger.warning(
+                f"Converted {converted} snapshot tensors to {dtype}; they are no longer memory-mapped. "
+                f"Create the snapshot with the --dtype matching MODEL_QUANTIZATION to avoid this"
+            )
+
+        model.load_state_dict(state_dict, strict=False, assign=True)
+        model.tie_weights()
+        missing = [name for name, param in model.named_parameters() if param.is_meta]
+        if missing:
+            raise RuntimeError(f"Snapshot is missing weights: {', '.join(missing[:5])}")
+        return model
+
+    def _resolve_quantization(self) -> str:
+        """Read MODEL_QUANTIZATION and fall back to 'none' where a mode is not applicable."""
+        quantization = os.getenv('MODEL_QUANTIZATION', 'none').lower()
+        if quantization not in QUANTIZATION_MODES:
+            logger.warning(f"Unknown MODEL_QUANTIZATION '{quantization}', using full precision")
+            return 'none'
+        if quantization != 'none' and self._device != 'cpu':
+            logger.info("MODEL_QUANTIZATION only applies to CPU inference, ignoring")
+            return 'none'
+        if quantization == 'bf16' and not _cpu_supports_bf16():
+            logger.warning("CPU has no native bf16 support, using full precision")
+            return 'none'
+        return quantization
+
+    @property
+    def quantization(self):
+        return self._quantization
+
     @property
     def model(self):
         return self._model
@@ -0,0 +1,138 @@
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# numpy is imported on first use so importing this module (from the
+# controller) does not slow down bot startup
+
+HASH_SIZE = 16
+# A 16x16 difference hash is 256 bits, stored as four uint64 words
+HASH_WORDS = HASH_SIZE * HASH_SIZE // 64
+
+
+def dhash(image, hash_size: int = HASH_SIZE):
+    """
+    Difference hash of an image: shrink to (hash_size + 1) x hash_size
+    greyscale pixels and record whether each pixel is brighter than its right
+    neighbour. Small shifts, rescaling and recompression barely change it.
+    """
+    import numpy as np
+    from PIL import Image
+
+    small = image.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+    return np.packbits(bits).view('>u8').astype(np.uint64)
+
+
+def _popcount(words):
+    import numpy as np
+
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1)
+    # numpy < 2.0: count set bits per byte through a lookup table
+    table = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+    return table[words.view(np.uint8)].reshape(words.shape[0], -1).sum(axis=-1)
+
+
+class _HashTable:
+    """Fixed-size ring buffer of recent hashes for one document type."""
+
+    def __init__(self, capacity: int, fingerprint: str):
+        import numpy as np
+
+        self.fingerprint = fingerprint
+        self.hashes = np.zeros((capacity, HASH_WORDS), dtype=np.uint64)
+        self.user_ids = np.full(capacity, -1, dtype=np.int64)
+        self.created = np.zeros(capacity, dtype=np.float64)
+        self.results = [None] * capacity
+        self.position = 0
+
+
+class NearDuplicateIndex:
+    """
+    Perceptual hashes of recently extracted uploads, so a re-shot photo of a
+    document a user already sent reuses its result instead of running the
+    model again.
+
+    Each document type keeps its last `capacity` uploads (across users) in
+    numpy arrays; a lookup is one vectorised XOR/popcount over all of them,
+    restricted to the same user, entries younger than ttl seconds and the
+    same extraction fingerprint (prompt, model, decoding profile). A match
+    needs a Hamming distance of at most max_distance out of 256 bits.
+
+    Off by default: one account can onboard several people, and two cards of
+    the same type shot on the same desk can hash within a few bits of each
+    other, which would hand the second person the first one's data.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, max_distance: int = -1, capacity: int = 4096, ttl: float = 3600):
+        self.max_distance = max_distance
+        self.capacity = capacity
+        self.ttl = ttl
+        self._tables = {}
+        self._tables_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                # A negative distance disables near-duplicate matching
+                cls._instance = cls(
+                    max_distance=int(os.getenv('NEAR_DUPLICATE_MAX_DISTANCE', -1)),
+                    capacity=int(os.getenv('NEAR_DUPLICATE_CAPACITY', 4096)),
+                    ttl=float(os.getenv('NEAR_DUPLICATE_TTL', 3600))
+                )
+        return cls._instance
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_distance >= 0 and self.capacity > 0
+
+    def _table(self, document_type: str, fingerprint: str) -> _HashTable:
+        table = self._tables.get(document_type)
+        # Results extracted under another prompt, model or profile are not reused
+        if table is None or table.fingerprint != fingerprint:
+            table = _HashTable(self.capacity, fingerprint)
+            self._tables[document_type] = table
+        return table
+
+    def lookup(self, user_id: int, document_type: str, image_hash, fingerprint: str) -> Optional[str]:
+        """Return the result of this user's closest recent upload within max_distance, if any."""
+        if not self.enabled:
+            return None
+        import numpy as np
+
+        with self._tables_lock:
+            table = self._table(document_type, fingerprint)
+            candidates = (table.user_ids == user_id) & (table.created >= time.time() - self.ttl)
+            if not candidates.any():
+                return None
+
+            distances = _popcount(table.hashes ^ image_hash)
+            distances = np.where(candidates, distances, HASH_SIZE * HASH_SIZE + 1)
+            best = int(np.argmin(distances))
+            if distances[best] > self.max_distance:
+                return None
+
+            logger.info(f"Near-duplicate {document_type} upload (distance {distances[best]})")
+            return table.results[best]
+
+    def add(self, user_id: int, document_type: str, image_hash, fingerprint: str, result: str) -> None:
+        if not self.enabled:
+            return
+
+        with self._tables_lock:
+            table = self._table(document_type, fingerprint)
+            slot = table.position
+            table.hashes[slot] = image_hash
+            table.user_ids[slot] = user_id
+            table.created[slot] = time.time()
+            table.results[slot] = result
+            table.position = (slot + 1) % self.capacity
@@ -0,0 +1,158 @@
+import logging
+import os
+import re
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pytesseract
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Mean Tesseract word confidence (0-100) a field's value needs to be accepted
+OCR_MIN_CONFIDENCE = float(os.getenv('OCR_MIN_CONFIDENCE', 80))
+
+NRIC = r"[STFGM]\d{7}[A-Z]"
+NUMERIC_DATE = r"\d{1,2}[-/.]\d{1,2}[-/.]\d{4}"
+ISO_DATE = r"\d{4}-\d{2}-\d{2}"
+# 15 Jan 1990, 15-Jan-1990, 15 January 1990, Jan 15, 1990
+TEXT_DATE = r"\d{1,2}[ -][A-Z][a-z]{2,8}\.?[ -]\d{4}|[A-Z][a-z]{2,8}\.? \d{1,2},? \d{4}"
+DATE = rf"{NUMERIC_DATE}|{ISO_DATE}|{TEXT_DATE}"
+NAME = r"[A-Z][A-Z ,'@/.()-]*[A-Z.)]"
+PLACE = r"[A-Z][A-Z -]+[A-Z]"
+
+
+def _same_line(label: str, value: str) -> str:
+    """'Label: value' or 'Label value' on one line, as on log cards."""
+    return rf"(?im)^[^\S\n]*{label}[^\S\n]*[:.]?[^\S\n]*(?P<value>{value})[^\S\n]*$"
+
+
+def _after(label: str, value: str, gap: int = 40) -> str:
+    """The first value within a few characters after its label, on the same or a following line."""
+    return rf"(?i:{label})[\s\S]{{0,{gap}}}?(?P<value>{value})"
+
+
+def _below(label: str, value: str) -> str:
+    """A value on the line below its label, as on identity cards."""
+    return rf"(?m)^[^\S\n]*(?i:{label})[^\S\n]*\n[^\S\n]*(?P<value>{value})[^\S\n]*$"
+
+
+def _anywhere(label: Optional[str], value: str) -> str:
+    """A value distinctive enough to be found without its label."""
+    return rf"\b(?P<value>{value})\b"
+
+
+# Per document type, how each field is laid out: (layout, label regex, value
+# regex). The value regex also validates values read by the model; fields
+# without an entry are always left to the model and never rejected
+FIELD_FORMATS: Dict[str, Dict[str, Tuple[Callable[[str, str], str], Optional[str], str]]] = {
+    'id_card': {
+        "Name": (_below, r"Name", NAME),
+        "Race": (_below, r"Race", PLACE),
+        "Date of birth": (_after, r"Date of birth", DATE),
+        "Sex": (_after, r"\bSex\b", r"\b[MF]\b"),
+        "Country/Place of birth": (_below, r"Country\s*/\s*Place of birth", PLACE),
+        "ID Number": (_anywhere, None, NRIC),
+    },
+    'license': {
+        "Name": (_below, r"Name", NAME),
+        "License Number": (_after, r"Licen[cs]e\s*No\.?", NRIC),
+        "Date of birth": (_after, r"Date of birth", DATE),
+        "Issue Date": (_after, r"(?:Date of )?Issue(?: Date)?", DATE),
+    },
+    'log_card': {
+        "Vehicle No": (_same_line, r"Vehicle No\.?", r"[A-Z]{1,3}\d{1,4}[A-Z]"),
+        "Chassis No": (_same_line, r"Chassis No\.?", r"[A-HJ-NPR-Z0-9]{11,17}"),
+        "Engine No": (_same_line, r"Engine No\.?", r"[A-Z0-9]{6,20}"),
+        "Engine Capacity": (_same_line, r"Engine Capacity", r"\d{3,5} ?cc"),
+        "Maximum Power Output": (_same_line, r"Maximum Power Output", r"\d+(?:\.\d+)? ?kW(?: \(\d+ ?bhp\))?"),
+        "Unladen Weight": (_same_line, r"Unladen Weight", r"\d{3,5} ?kg"),
+        "Maximum Laden Weight": (_same_line, r"Maximum Laden Weight", r"\d{3,5} ?kg"),
+        "Year Of Manufacture": (_same_line, r"Year Of Manufacture", r"(?:19|20)\d{2}"),
+        "Original Registration Date": (_same_line, r"Original Registration Date", DATE),
+        "COE Expiry Date": (_same_line, r"COE Expiry Date", DATE),
+        "Road Tax Expiry Date": (_same_line, r"Road Tax Expiry Date", DATE),
+        "Intended Transfer Date": (_same_line, r"Intended Transfer Date", DATE),
+    },
+}
+
+# The regex OCR text is searched with, per document type and field
+FIELD_PATTERNS: Dict[str, Dict[str, str]] = {
+    document_type: {field: layout(label, value) for field, (layout, label, value) in formats.items()}
+    for document_type, formats in FIELD_FORMATS.items()
+}
+
+
+def is_valid_value(document_type: str, field: str, value: Optional[str]) -> bool:
+    """
+    Whether a field's value is present and, where its format is known,
+    well-formed. Case and repeated whitespace are ignored, so that "Tan Ah
+    Kow" or "15 JAN 1990" do not trigger a re-extraction.
+    """
+    if not value or value.lower() == 'not found':
+        return False
+    field_format = FIELD_FORMATS.get(document_type, {}).get(field)
+    if field_format is None:
+        return True
+    value = ' '.join(value.split())
+    return re.fullmatch(field_format[2], value, re.IGNORECASE) is not None
+
+
+def _ocr_words(image: Image.Image) -> Tuple[str, List[Tuple[int, int, float]]]:
+    """
+    Run Tesseract once and rebuild its text line by line, keeping the
+    character span and confidence of every word.
+    """
+    data = pytesseract.image_to_data(image, config='--psm 3', output_type=pytesseract.Output.DICT)
+    text = ''
+    spans = []
+    previous_line = None
+    for i, word in enumerate(data['text']):
+        word = word.strip()
+        confidence = float(data['conf'][i])
+        if not word or confidence < 0:
+            continue
+        line = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        if previous_line is not None:
+            text += '\n' if line != previous_line else ' '
+        previous_line = line
+        spans.append((len(text), len(text) + len(word), confidence))
+        text += word
+    return text, spans
+
+
+def read_fields(image: Image.Image, document_type: str) -> Dict[str, str]:
+    """
+    OCR the image and return the fields of FIELD_PATTERNS whose value matches
+    its pattern with a mean word confidence of at least OCR_MIN_CONFIDENCE.
+    """
+    patterns = FIELD_PATTERNS.get(document_type)
+    if not patterns:
+        return {}
+
+    try:
+        start = time.perf_counter()
+        text, spans = _ocr_words(image)
+    except Exception as e:
+        # Missing tesseract binary or a broken image: the model reads every field
+        logger.error(f"OCR failed: {str(e)}")
+        return {}
+
+    fields = {}
+    for field, pattern in patterns.items():
+        match = re.search(pattern, text)
+        if match is None:
+            continue
+        begin, end = match.span('value')
+        confidences = [c for s, e, c in spans if s < end and e > begin]
+        confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        if confidence >= OCR_MIN_CONFIDENCE:
+            fields[field] = match.group('value').strip()
+        else:
+            logger.info(f"OCR value for {field} rejected (confidence {confidence:.0f})")
+
+    logger.info(
+        f"OCR read {len(fields)}/{len(patterns)} {document_type} field(s) "
+        f"in {(time.perf_counter() - start) * 1000:.0f} ms"
+    )
+    return fields
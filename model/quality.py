@@ -0,0 +1,127 @@
+import logging
+import os
+import time
+from typing import Dict, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# cv2 and numpy are imported on first use so importing this module (from the
+# controller) does not slow down bot startup
+
+# Metrics are measured on a copy scaled to this longest edge, so the
+# thresholds below do not depend on the photo's resolution
+QUALITY_WORKING_EDGE = 1024
+MIN_SHARPNESS = float(os.getenv('QUALITY_MIN_SHARPNESS', 60))  # Variance of the Laplacian
+MIN_BRIGHTNESS = float(os.getenv('QUALITY_MIN_BRIGHTNESS', 50))  # Mean grey level, 0-255
+MAX_BRIGHTNESS = float(os.getenv('QUALITY_MAX_BRIGHTNESS', 225))
+MAX_GLARE_FRACTION = float(os.getenv('QUALITY_MAX_GLARE', 0.04))  # Share of blown-out document pixels
+MIN_DOCUMENT_AREA = float(os.getenv('QUALITY_MIN_DOCUMENT_AREA', 0.15))  # Share of the frame
+
+BLURRY_MESSAGE = "The photo is blurry. Hold the camera steady and make sure the text is in focus."
+DARK_MESSAGE = "The photo is too dark. Please retake it in better light."
+BRIGHT_MESSAGE = "The photo is overexposed. Please retake it without direct light on the document."
+GLARE_MESSAGE = "There is glare on the document. Tilt it slightly away from the light and retake the photo."
+NO_DOCUMENT_MESSAGE = "No document was found in the photo. Fit the whole card in the frame, on a plain background."
+
+
+def _grey(image: Image.Image):
+    import cv2
+    import numpy as np
+
+    gray = np.asarray(image.convert('L'))
+    scale = QUALITY_WORKING_EDGE / max(gray.shape)
+    if scale < 1:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return gray
+
+
+def document_area_fraction(gray) -> float:
+    """Share of the frame covered by the largest closed edge contour, i.e. the document's outline."""
+    return _document_region(gray)[0]
+
+
+def _document_region(gray):
+    """
+    (area fraction, mask) of the document's outline, found the same way as
+    by the crop (model/document_crop.py). The mask covers the whole frame
+    when the outline is too small to be the document.
+    """
+    import cv2
+    import numpy as np
+    from model.document_crop import document_contours
+
+    contours = document_contours(gray)
+    if not contours:
+        return 0.0, None
+    width, height = cv2.minAreaRect(contours[0])[1]
+    area = (width * height) / float(gray.shape[0] * gray.shape[1])
+    if area < MIN_DOCUMENT_AREA:
+        return area, None
+
+    mask = np.zeros(gray.shape, dtype=np.uint8)
+    cv2.fillPoly(mask, [cv2.convexHull(contours[0])], 1)
+    return area, mask.astype(bool)
+
+
+def quality_metrics(image: Image.Image) -> Dict[str, float]:
+    """
+    Brightness, sharpness, glare and document area of a photo. Brightness
+    and glare are measured inside the document's outline, so a white desk
+    around the card or a white paper log card's margins do not count.
+    """
+    import cv2
+
+    gray = _grey(image)
+    document_area, mask = _document_region(gray)
+    # Blown-out pixels, smoothed so that isolated white specks do not count
+    blown_out = cv2.GaussianBlur(gray, (9, 9), 0) >= 250
+    if mask is not None:
+        region, blown_out = gray[mask], blown_out[mask]
+    else:
+        region = gray
+
+    return {
+        'brightness': float(region.mean()),
+        'sharpness': float(cv2.Laplacian(gray, cv2.CV_64F).var()),
+        'glare': float(blown_out.mean()),
+        'document_area': document_area,
+    }
+
+
+def assess_quality(image: Image.Image) -> Tuple[bool, str]:
+    """
+    Reject photos the model cannot read before they reach it: too dark or
+    overexposed, blurry, washed out by glare, or without a visible document.
+    Returns (is_usable, message) like validate_image.
+    """
+    try:
+        start = time.perf_counter()
+        metrics = quality_metrics(image)
+        brightness = metrics['brightness']
+        sharpness = metrics['sharpness']
+        glare = metrics['glare']
+        document_area = metrics['document_area']
+
+        logger.info(
+            f"Image quality: brightness {brightness:.0f}, sharpness {sharpness:.0f}, "
+            f"glare {glare:.1%}, document {document_area:.0%} "
+            f"({(time.perf_counter() - start) * 1000:.1f} ms)"
+        )
+
+        if brightness < MIN_BRIGHTNESS:
+            return False, DARK_MESSAGE
+        if brightness > MAX_BRIGHTNESS:
+            return False, BRIGHT_MESSAGE
+        if sharpness < MIN_SHARPNESS:
+            return False, BLURRY_MESSAGE
+        if glare > MAX_GLARE_FRACTION:
+            return False, GLARE_MESSAGE
+        if document_area < MIN_DOCUMENT_AREA:
+            return False, NO_DOCUMENT_MESSAGE
+        return True, "Image quality is sufficient"
+    except Exception as e:
+        # A failing check must not block an otherwise valid upload
+        logger.error(f"Image quality assessment failed: {str(e)}")
+        return True, "Image quality not assessed"
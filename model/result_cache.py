@@ -0,0 +1,177 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from model.decoding import get_profile_name
+from model.image_loading import resolution_mode
+from model.model_info import model_version
+
+logger = logging.getLogger(__name__)
+
+# Pipeline settings that change extracted values. They are read as raw
+# strings, so the fingerprint does not import the modules that define them
+EXTRACTION_SETTINGS = (
+    'DOCUMENT_CROP',
+    'DOCUMENT_CROP_MIN_AREA',
+    'CROPPED_LONGEST_EDGE',
+    'OCR_FAST_PATH',
+    'OCR_MIN_CONFIDENCE',
+    'SCHEMA_STOPPING',
+    'RE_EXTRACT_MISSING_FIELDS',
+)
+
+
+def extraction_fingerprint(document_type: str) -> str:
+    """
+    Everything besides the image that shapes the model's answer: document
+    type, prompt, model version, decoding profile, resolution mode and
+    the EXTRACTION_SETTINGS.
+    """
+    # Same variable the document processors read their prompt from (PROMPT_ENV)
+    prompt = os.getenv(f"{document_type.upper()}_PROMPT", '')
+    settings = [f"{name}={os.getenv(name, '')}" for name in EXTRACTION_SETTINGS]
+    settings.append(f"TILE_GRID={os.getenv(f'{document_type.upper()}_TILE_GRID', '')}")
+    parts = (
+        document_type,
+        hashlib.sha256(prompt.encode()).hexdigest(),
+        model_version(),
+        get_profile_name(document_type),
+        resolution_mode(document_type),
+        *settings,
+    )
+    return hashlib.sha256('\n'.join(parts).encode()).hexdigest()
+
+
+def result_cache_key(data: bytes, fingerprint: str) -> str:
+    """Key an extraction by the image bytes and its extraction_fingerprint."""
+    return hashlib.sha256(f"{hashlib.sha256(data).hexdigest()}\n{fingerprint}".encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Extracted text by result_cache_key, so re-uploading the same photo skips
+    inference.
+
+    Entries live in an in-memory LRU of max_entries and expire after ttl
+    seconds. With db_path set they are also written to a SQLite file, which
+    serves misses of the memory tier and survives restarts.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self, max_entries: int = 256, ttl: float = 86400, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._entries_lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._conn = None
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM results WHERE created < ?", (time.time() - ttl,))
+            logger.info(f"Result cache persisted at {db_path}")
+
+    @classmethod
+    def get_instance(cls):
+        with cls._lock:
+            if cls._instance is None:
+                enabled = os.getenv('RESULT_CACHE', '1') != '0'
+                cls._instance = cls(
+                    max_entries=int(os.getenv('RESULT_CACHE_SIZE', 256)) if enabled else 0,
+                    ttl=float(os.getenv('RESULT_CACHE_TTL', 86400)),
+                    db_path=os.getenv('RESULT_CACHE_DB_PATH') if enabled else None
+                )
+        return cls._instance
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or self._conn is not None
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached text for key, or None when missing or expired."""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._entries_lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            row = None
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT created, value FROM results WHERE key = ? AND created >= ?",
+                    (key, now - self.ttl)
+                ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, row[0], row[1])
+            return row[1]
+
+    def put(self, key: str, value: str) -> None:
+        if not self.enabled:
+            return
+
+        created = time.time()
+        with self._entries_lock:
+            self._remember(key, created, value)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (key, value, created) VALUES (?, ?, ?)",
+                    (key, value, created)
+                )
+
+    def _remember(self, key: str, created: float, value: str) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (created, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'entries': len(self._entries),
+        }
+
+    def close(self) -> None:
+        with self._entries_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
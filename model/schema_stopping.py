@@ -0,0 +1,75 @@
+import logging
+from typing import List, Optional, Sequence
+
+import torch
+from transformers import StoppingCriteria
+
+logger = logging.getLogger(__name__)
+
+# Consecutive finished lines outside the schema after which the model is
+# taken to have moved past the fields. One is not enough: near-miss labels
+# such as "Make / Model" or "Vehicle Number" appear between real fields
+MAX_OFF_SCHEMA_LINES = 3
+
+
+def _line_field(line: str, fields: Sequence[str]) -> Optional[str]:
+    """Return the schema field a 'Field: value' line belongs to, if any."""
+    if ':' not in line:
+        return None
+    key = line.split(':', 1)[0].strip().rstrip('.').lower()
+    for field in fields:
+        if key == field.lower():
+            return field
+    return None
+
+
+def schema_complete(text: str, fields: Sequence[str]) -> bool:
+    """
+    True once every field has a finished 'Field: value' line, or once the
+    model has written MAX_OFF_SCHEMA_LINES lines in a row outside the schema
+    after emitting schema fields.
+    """
+    # The last line may still be growing, so only judge finished lines
+    finished_lines = [line.strip() for line in text.split('\n')[:-1]]
+    seen = set()
+    off_schema = 0
+    for line in finished_lines:
+        if not line:
+            continue
+        field = _line_field(line, fields)
+        if field is None:
+            if seen:
+                off_schema += 1
+                if off_schema >= MAX_OFF_SCHEMA_LINES:
+                    return True
+            continue
+        off_schema = 0
+        seen.add(field)
+    return len(seen) == len(fields)
+
+
+class FieldSchemaStoppingCriteria(StoppingCriteria):
+    """
+    Stops each sequence as soon as its document's field schema is satisfied
+    instead of always running to max_new_tokens.
+
+    row_fields holds one field list per request in the batch; with beam search
+    every request owns num_beams consecutive rows.
+    """
+
+    def __init__(self, tokenizer, prompt_length: int, row_fields: List[Sequence[str]], num_beams: int = 1):
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.row_fields = row_fields
+        self.num_beams = max(1, num_beams)
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> torch.BoolTensor:
+        done = []
+        for row, ids in enumerate(input_ids):
+            fields = self.row_fields[row // self.num_beams]
+            if not fields:
+                done.append(False)
+                continue
+            text = self.tokenizer.decode(ids[self.prompt_length:], skip_special_tokens=True)
+            done.append(schema_complete(text, fields))
+        return torch.tensor(done, dtype=torch.bool, device=input_ids.device)
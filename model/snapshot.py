@@ -0,0 +1,70 @@
+"""
+Materialise a pinned, offline copy of the model for MODEL_SNAPSHOT_DIR.
+
+    python -m model.snapshot --output model_snapshot --revision <commit> --dtype bf16
+
+The snapshot holds the processor files, the weights as safetensors (optionally
+pre-converted to bf16) and a snapshot.json manifest recording the source
+model, resolved revision and dtype. Point MODEL_SNAPSHOT_DIR at it to start
+without network access; ModelSingleton memory-maps the weights from there.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+
+import torch
+from transformers import AutoModelForVision2Seq, AutoProcessor
+
+from model.model_info import MODEL_NAME, SNAPSHOT_MANIFEST
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DTYPES = {'fp32': torch.float32, 'bf16': torch.bfloat16}
+
+
+def create_snapshot(output: str, revision: str = None, dtype: str = 'fp32') -> dict:
+    """Download (or reuse from the hub cache) the model and save it to output."""
+    os.makedirs(output, exist_ok=True)
+
+    processor = AutoProcessor.from_pretrained(MODEL_NAME, revision=revision, trust_remote_code=True)
+    model = AutoModelForVision2Seq.from_pretrained(
+        MODEL_NAME,
+        revision=revision,
+        trust_remote_code=True,
+        torch_dtype=SNAPSHOT_DTYPES[dtype]
+    )
+
+    processor.save_pretrained(output)
+    model.save_pretrained(output, safe_serialization=True)
+
+    manifest = {
+        'model': MODEL_NAME,
+        # The commit the weights were resolved to, even when no revision was pinned
+        'revision': getattr(model.config, '_commit_hash', None) or revision,
+        'dtype': dtype,
+        'created': datetime.now().isoformat(timespec='seconds'),
+    }
+    with open(os.path.join(output, SNAPSHOT_MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info(f"Snapshot written to {output}: {manifest}")
+    return manifest
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default='model_snapshot')
+    parser.add_argument('--revision', default=os.getenv('MODEL_REVISION'), help="hub commit, tag or branch to pin")
+    parser.add_argument('--dtype', choices=sorted(SNAPSHOT_DTYPES), default='fp32')
+    args = parser.parse_args()
+
+    create_snapshot(args.output, args.revision, args.dtype)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
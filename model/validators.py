@@ -1,16 +1,14 @@
 from PIL import Image
-import os
 import logging
 
 logger = logging.getLogger(__name__)
 
-def validate_image(image_path):
+def validate_image(image: Image.Image, file_size: int):
     try:
-        with Image.open(image_path) as img:
-            if img.size[0] < 100 or img.size[1] < 100:
-                return False, "Image is too small"
-            if os.path.getsize(image_path) < 1024:
-                return False, "Image file is too small"
-            return True, "Image is valid"
+        if image.size[0] < 100 or image.size[1] < 100:
+            return False, "Image is too small"
+        if file_size < 1024:
+            return False, "Image file is too small"
+        return True, "Image is valid"
     except Exception as e:
-        return False, f"Invalid image: {str(e)}" 
\ No newline at end of file
+        return False, f"Invalid image: {str(e)}"
@@ -0,0 +1,40 @@
+import logging
+import os
+import time
+
+from PIL import Image, ImageDraw
+
+from model.document_processor import DocumentProcessorFactory
+
+logger = logging.getLogger(__name__)
+
+WARMUP_DOCUMENT_TYPES = ('id_card', 'license', 'log_card')
+
+
+def _synthetic_document() -> Image.Image:
+    """A card-sized image with a few text lines, enough to exercise every stage of the model."""
+    image = Image.new('RGB', (856, 540), 'white')
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(("Name: WARM UP", "Date of birth: 01 Jan 2000", "ID Number: S0000000A")):
+        draw.text((40, 60 + i * 60), line, fill='black')
+    return image
+
+
+def warm_up_model() -> None:
+    """
+    Load the model and run one generate() per document type so the first
+    real request does not pay for loading and first-call initialisation.
+    Disabled with MODEL_WARMUP=0.
+    """
+    if os.getenv('MODEL_WARMUP', '1') == '0':
+        return
+
+    image = _synthetic_document()
+    for document_type in WARMUP_DOCUMENT_TYPES:
+        start = time.perf_counter()
+        try:
+            processor = DocumentProcessorFactory.get_processor(document_type)
+            processor.generate_text(image)
+            logger.info(f"Warmed up {document_type} in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            logger.warning(f"Warm-up for {document_type} failed: {str(e)}")
@@ -0,0 +1,222 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+logger = logging.getLogger(__name__)
+
+USER_DATA = 'user_data'
+CONVERSATIONS = 'conversations'
+
+
+class SessionStore(ABC):
+    """Key/value backend for bot sessions. Keys and values are JSON strings."""
+
+    @abstractmethod
+    def load(self, namespace: str) -> Dict[str, str]:
+        """Return every stored entry of a namespace."""
+        pass
+
+    @abstractmethod
+    def write_many(self, namespace: str, items: Dict[str, Optional[str]]) -> None:
+        """Upsert entries in one batch; a value of None deletes the key."""
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteSessionStore(SessionStore):
+    """SessionStore backed by a single SQLite file in WAL mode."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+        logger.info(f"Session store opened at {path}")
+
+    def load(self, namespace: str) -> Dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM sessions WHERE namespace = ?", (namespace,)
+            ).fetchall()
+        return dict(rows)
+
+    def write_many(self, namespace: str, items: Dict[str, Optional[str]]) -> None:
+        upserts = [(namespace, k, v) for k, v in items.items() if v is not None]
+        deletes = [(namespace, k) for k, v in items.items() if v is None]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO sessions (namespace, key, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value",
+                    upserts
+                )
+                self._conn.executemany(
+                    "DELETE FROM sessions WHERE namespace = ? AND key = ?", deletes
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedPersistence(BasePersistence):
+    """
+    python-telegram-bot persistence for user_data and conversation states.
+
+    Reads are served from an in-memory cache loaded once at startup. Updates
+    are written through to the cache immediately and queued; queued entries
+    are committed to the SessionStore in a single transaction on a worker
+    thread shortly after a burst of updates, and on flush().
+    """
+
+    def __init__(self, store: SessionStore, update_interval: float = 5, write_delay: float = 0.1):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=update_interval
+        )
+        self.store = store
+        self.write_delay = write_delay
+
+        self._user_data: Optional[Dict[int, dict]] = None
+        self._conversations: Dict[str, dict] = {}
+        # namespace -> key -> serialized value (None = delete)
+        self._pending: Dict[str, Dict[str, Optional[str]]] = {}
+        self._serialized: Dict[str, Dict[str, str]] = {}
+        self._commit_task: Optional[asyncio.Task] = None
+
+    def _queue(self, namespace: str, key: str, value: Optional[str]) -> None:
+        cached = self._serialized.setdefault(namespace, {})
+        if cached.get(key) == value:
+            return
+        if value is None:
+            cached.pop(key, None)
+        else:
+            cached[key] = value
+
+        self._pending.setdefault(namespace, {})[key] = value
+        if self._commit_task is None or self._commit_task.done():
+            self._commit_task = asyncio.create_task(self._commit_later())
+
+    async def _commit_later(self) -> None:
+        # Entries queued while a commit is running are picked up by the next round
+        while self._pending:
+            await asyncio.sleep(self.write_delay)
+            if not await self._commit():
+                break
+
+    async def _commit(self) -> bool:
+        pending, self._pending = self._pending, {}
+        success = True
+        for namespace, items in pending.items():
+            try:
+                await asyncio.to_thread(self.store.write_many, namespace, items)
+            except Exception as e:
+                logger.error(f"Failed to persist {len(items)} {namespace} entries: {str(e)}")
+                success = False
+                # Keep them queued for the next commit, unless newer values arrived
+                retry = self._pending.setdefault(namespace, {})
+                for key, value in items.items():
+                    retry.setdefault(key, value)
+        return success
+
+    async def get_user_data(self) -> Dict[int, dict]:
+        if self._user_data is None:
+            stored = self.store.load(USER_DATA)
+            self._serialized[USER_DATA] = dict(stored)
+            self._user_data = {int(k): json.loads(v) for k, v in stored.items()}
+        return self._user_data
+
+    async def get_conversations(self, name: str) -> dict:
+        if name not in self._conversations:
+            namespace = f"{CONVERSATIONS}:{name}"
+            stored = self.store.load(namespace)
+            self._serialized[namespace] = dict(stored)
+            self._conversations[name] = {
+                tuple(json.loads(k)): json.loads(v) for k, v in stored.items()
+            }
+        return self._conversations[name]
+
+    async def update_conversation(self, name: str, key, new_state: Optional[object]) -> None:
+        conversations = self._conversations.setdefault(name, {})
+        if new_state is None:
+            conversations.pop(key, None)
+        else:
+            conversations[key] = new_state
+        self._queue(
+            f"{CONVERSATIONS}:{name}",
+            json.dumps(list(key)),
+            None if new_state is None else json.dumps(new_state)
+        )
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        if self._user_data is None:
+            self._user_data = {}
+        self._user_data[user_id] = data
+        self._queue(USER_DATA, str(user_id), json.dumps(data, sort_keys=True) if data else None)
+
+    async def drop_user_data(self, user_id: int) -> None:
+        if self._user_data is not None:
+            self._user_data.pop(user_id, None)
+        self._queue(USER_DATA, str(user_id), None)
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        # The cache is authoritative for this process
+        pass
+
+    async def flush(self) -> None:
+        if self._commit_task is not None and not self._commit_task.done():
+            await self._commit_task
+        await self._commit()
+        self.store.close()
+
+    # Chat, bot and callback data are not persisted (see store_data)
+
+    async def get_chat_data(self) -> Dict[int, dict]:
+        return {}
+
+    async def get_bot_data(self) -> dict:
+        return {}
+
+    async def get_callback_data(self):
+        return None
+
+    async def update_chat_data(self, chat_id: int, data: dict) -> None:
+        pass
+
+    async def update_bot_data(self, data: dict) -> None:
+        pass
+
+    async def update_callback_data(self, data) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: dict) -> None:
+        pass
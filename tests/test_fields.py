@@ -0,0 +1,58 @@
+from model.fields import merge_field_answers, parse_field_values
+
+ID_CARD_FIELDS = ("Name", "Race", "Date of birth", "Sex", "Country/Place of birth", "ID Number")
+
+# The answer tokens of a field-prompt generate(), decoded with skip_special_tokens
+DECODED_ANSWER = " Name: TAN AH KOW\nDate of birth: 15 JAN 1990\nID Number: S1234567D"
+
+# The same generate() decoded with the prompt, as the batch engine used to return it
+DECODED_WITH_PROMPT = (
+    "User:<image>Extract only the following fields from this document. Answer with one "
+    "'Field: value' line per field, using 'Not found' for fields that are not visible.\n"
+    "Name:\nDate of birth:\nID Number:\n"
+    "Assistant: Name: TAN AH KOW\nDate of birth: 15 JAN 1990\nID Number: S1234567D"
+)
+
+EXPECTED = {"Name": "TAN AH KOW", "Date of birth": "15 JAN 1990", "ID Number": "S1234567D"}
+
+
+def test_parses_decoded_answer():
+    assert parse_field_values(DECODED_ANSWER, ID_CARD_FIELDS) == EXPECTED
+
+
+def test_keeps_first_field_after_assistant_marker():
+    assert parse_field_values(DECODED_WITH_PROMPT, ID_CARD_FIELDS) == EXPECTED
+
+
+def test_skips_not_found_and_unknown_fields():
+    text = "Name: TAN AH KOW\nRace: Not found\nBlood group: O+\nSex:"
+    assert parse_field_values(text, ID_CARD_FIELDS) == {"Name": "TAN AH KOW"}
+
+
+def _year_is_valid(field, value):
+    return field != "Year Of Manufacture" or value.isdigit()
+
+
+def test_merge_prefers_values_tiles_agree_on():
+    answers = [
+        {"Engine No": "G4FCAB1234"},
+        {"Engine No": "G4FC9U5678"},
+        {"Engine No": "g4fc9u5678"},
+    ]
+    values, conflicts = merge_field_answers(answers, _year_is_valid)
+    assert values == {"Engine No": "G4FC9U5678"}
+    assert conflicts == {}
+
+
+def test_merge_prefers_well_formed_over_first_seen():
+    answers = [{"Year Of Manufacture": "Not visible"}, {"Year Of Manufacture": "2015"}]
+    values, _ = merge_field_answers(answers, _year_is_valid)
+    assert values == {"Year Of Manufacture": "2015"}
+
+
+def test_merge_reports_conflicting_tile_answers():
+    # The upper tile cannot see the engine number but still answers plausibly
+    answers = [{"Vehicle No": "SBA1234A", "Engine No": "G4FCAB1234"}, {"Engine No": "G4FC9U5678"}]
+    values, conflicts = merge_field_answers(answers, _year_is_valid)
+    assert values == {"Vehicle No": "SBA1234A"}
+    assert conflicts == {"Engine No": ["G4FCAB1234", "G4FC9U5678"]}
@@ -11,7 +11,10 @@ class TelegramView:
     async def send_welcome_message(update):
         await update.message.reply_text(
             "Welcome to GoBingo Telegram AI Bot! 👋\n\n"
-            "Please upload your Identity Card photo."
+            "Please send photos of your Identity Card, Driver's License and Log Card. "
+            "You can send them one by one or together as an album, without waiting for each result.\n"
+            "Add a caption (ID, License or Log Card) to say which is which; "
+            "otherwise they are taken in that order."
         )
 
     @staticmethod
@@ -36,6 +39,10 @@ class TelegramView:
     async def send_validation_error(update, message):
         await update.message.reply_text(f"Image validation failed: {message}")
 
+    @staticmethod
+    async def send_quality_error(update, message):
+        await update.message.reply_text(f"📷 {message}")
+
     @staticmethod
     async def send_processing_complete(update, doc_type):
         await update.message.reply_text(f"{doc_type} processing completed successfully.")
@@ -44,6 +51,31 @@ class TelegramView:
     async def request_next_document(update, doc_type):
         await update.message.reply_text(f"Please upload your {doc_type} photo.")
 
+    @staticmethod
+    async def request_resend(update, doc_type, caption):
+        await update.message.reply_text(f"Please send the {doc_type} photo again with the caption \"{caption}\".")
+
+    @staticmethod
+    async def request_documents(update, doc_types):
+        await update.message.reply_text(f"Please send your {', '.join(doc_types)} photo again.")
+
+    @staticmethod
+    async def send_all_documents_received(update):
+        await update.message.reply_text(
+            "All three documents are already being processed. "
+            "To replace one, send it again with a caption (ID, License or Log Card)."
+        )
+
+    @staticmethod
+    async def send_documents_saving(update):
+        await update.message.reply_text(
+            "Your documents are being saved. Send /start afterwards to begin a new onboarding."
+        )
+
+    @staticmethod
+    async def send_session_over(update):
+        await update.message.reply_text("This onboarding has ended. Send /start to begin a new one.")
+
     @staticmethod
     async def send_completion_message(update):
         await update.message.reply_text("Thank you for using GoBingo Telegram AI bot! 🎉")